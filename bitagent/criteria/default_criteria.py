@@ -39,7 +39,8 @@ def does_not_error(task, validator, synapse: bt.Synapse) -> Tuple[float, float,
 # CRITERION: reward speedy response
 def does_not_take_a_long_time(task, validator, synapse: bt.Synapse) -> Tuple[float, float, str]:
     max_reward = 0.5
-    process_time = synapse.dendrite.process_time
+    # for streamed responses, time to the complete call expression rather than to the end of the stream
+    process_time = getattr(synapse, "time_to_call", None) or synapse.dendrite.process_time
     if not process_time:
         feedback = f"You likely ran into an error processing this task and failed to respond appropriately."
         reward = 0
@@ -1,63 +1,168 @@
 import os
-import pandas as pd
+import json
+import shutil
+import hashlib
 import bittensor as bt
+import pyarrow as pa
+import pyarrow.feather as feather
 from datasets import load_dataset, load_from_disk
-from huggingface_hub import snapshot_download
+from huggingface_hub import HfApi, snapshot_download
+from bitagent.helpers.permutation import EpochPermutationIterator
+
+REVISION_FILE_NAME = "revision.txt"
+BFCL_DIR = "bitagent.data/bfcl"
+
+# TODO - other BFCL task types:
+# irrelevance and live_irrelevance - answer is NOTHING
+# exec_* (simple, multiple, parallel, parallel_multiple) - answer in the file itself
+# multi_turn_* - answer in the file itself
+# parallel* - answer in the file itself
+# rest - maybe later - calls to API that the validator would need to setup
+BFCL_FILENAMES = ["java", "javascript", "simple", "multiple", "sql", "live_simple", "live_multiple"]
+BFCL_COLUMNS = ("id", "question", "function", "ground_truth")
+BFCL_CACHE_FILE_NAME = "bfcl_columns.arrow"
+# nested values change shape from row to row, so they are stored as json text and decoded per row on access
+BFCL_JSON_COLUMNS = ("question", "function", "ground_truth")
+
+def bfcl_file_paths(bfcl_dir=BFCL_DIR):
+    return [
+        (f"{bfcl_dir}/BFCL_v3_{filename}.json", f"{bfcl_dir}/possible_answer/BFCL_v3_{filename}.json")
+        for filename in BFCL_FILENAMES
+    ]
+
+def bfcl_snapshot_fingerprint(paths):
+    """Identifies a BFCL snapshot by the size and mtime of its files, without reading them."""
+    h = hashlib.sha256()
+    for file_path in (p for pair in paths for p in pair):
+        st = os.stat(file_path)
+        h.update(f"{file_path}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+    return h.hexdigest()
+
+def read_jsonl(file_path):
+    with open(file_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def load_bfcl_columns(bfcl_dir=BFCL_DIR):
+    """
+    BFCL prompts and answers as an Arrow table of string columns, converted once per snapshot.
+
+    The table is written as an Arrow IPC file next to the JSON files, with the snapshot fingerprint in its
+    schema metadata, and memory mapped on later loads. The nested question/function/ground_truth values
+    are kept as json text (see `decode_bfcl_row`), only the rows actually drawn are decoded.
+    """
+    paths = bfcl_file_paths(bfcl_dir)
+    fingerprint = bfcl_snapshot_fingerprint(paths)
+    cache_path = f"{bfcl_dir}/{BFCL_CACHE_FILE_NAME}"
+    if os.path.exists(cache_path):
+        try:
+            table = feather.read_table(cache_path, memory_map=True)
+            if (table.schema.metadata or {}).get(b"fingerprint") == fingerprint.encode("utf-8"):
+                return table
+        except Exception as e:
+            bt.logging.warning(f"Could not read BFCL cache {cache_path}, rebuilding: {e}")
+
+    columns = {column: [] for column in BFCL_COLUMNS}
+    for file_path, answer_path in paths:
+        rows = read_jsonl(file_path)
+        answers = read_jsonl(answer_path)
+        for i, row in enumerate(rows):
+            columns["id"].append(row.get("id"))
+            for column in ("question", "function"):
+                columns[column].append(json.dumps(row.get(column)))
+            # answers line up with the prompts by position
+            columns["ground_truth"].append(json.dumps(answers[i].get("ground_truth") if i < len(answers) else None))
+
+    table = pa.table(
+        {column: pa.array(values, type=pa.string()) for column, values in columns.items()},
+        metadata={"fingerprint": fingerprint},
+    )
+    tmp_path = f"{cache_path}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+    return feather.read_table(cache_path, memory_map=True)
+
+def decode_bfcl_row(table, index):
+    row = {}
+    for column in BFCL_COLUMNS:
+        value = table.column(column)[index].as_py()
+        row[column] = json.loads(value) if column in BFCL_JSON_COLUMNS else value
+    return row
 
 class ShuffledJSONDatasetIterator:
-    def __init__(self):
-        dataframes = []
-
-        # TODO - other BFCL task types:
-        # irrelevance and live_irrelevance - answer is NOTHING
-        # exec_* (simple, multiple, parallel, parallel_multiple) - answer in the file itself
-        # multi_turn_* - answer in the file itself
-        # parallel* - answer in the file itself
-        # rest - maybe later - calls to API that the validator would need to setup
-
-        for filename in ["java", "javascript", "simple", "multiple", "sql", "live_simple", "live_multiple"]:
-            bfcl_path = "bitagent.data/bfcl/BFCL_v3_{filename}.json"
-            bfcl_answer_path = "bitagent.data/bfcl/possible_answer/BFCL_v3_{filename}.json"
-            file_path = bfcl_path.format(filename=filename)
-            answer_path = bfcl_answer_path.format(filename=filename)
-            df_data = pd.read_json(file_path, lines=True)
-            df_answer = pd.read_json(answer_path, lines=True)
-            df_data['ground_truth'] = df_answer['ground_truth']
-            dataframes.append(df_data[['id','question','function','ground_truth']])
-        self.all_data = pd.concat(dataframes)
-        self._shuffle_data()
-
-    def _shuffle_data(self):
-        self.shuffled_data = self.all_data.sample(frac=1, random_state=572343).reset_index(drop=True)
-        self.index = 0
+    """Endless shuffled iterator over the BFCL rows, yielding dicts with the BFCL_COLUMNS keys."""
+
+    def __init__(self, seed=572343, epoch=0, position=0, bfcl_dir=BFCL_DIR):
+        self.table = load_bfcl_columns(bfcl_dir)
+        self.seed = seed
+        self._shuffle_data(epoch, position)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def _shuffle_data(self, epoch=0, position=0):
+        # lazy keyed permutation, a new order every epoch without copying the data
+        self.order = EpochPermutationIterator(len(self), self.seed, epoch=epoch, position=position)
+
+    def state(self):
+        return self.order.state()
 
     def __iter__(self):
-        self.index = 0
         return self
 
     def __next__(self):
-        if self.index < len(self.shuffled_data):
-            row = self.shuffled_data.iloc[self.index]
-            self.index += 1
-            return row
-        else:
-            self._shuffle_data()  # Shuffle and reset index if end is reached
-            return self.__next__()
+        index = next(self.order)
+        return decode_bfcl_row(self.table, index)
+
+def get_dataset_revision(dataset_name):
+    """Commit sha of the dataset's main branch on the hub, None if the hub can't be reached."""
+    try:
+        return HfApi().dataset_info(dataset_name, token=os.getenv("HF_TOKEN", None)).sha
+    except Exception as e:
+        bt.logging.warning(f"Could not get the revision of {dataset_name}: {e}")
+        return None
+
+def read_local_revision(dataset_dir):
+    revision_path = f"{dataset_dir}/{REVISION_FILE_NAME}"
+    if not os.path.exists(f"{dataset_dir}/state.json") or not os.path.exists(revision_path):
+        return None
+    with open(revision_path, "r") as f:
+        return f.read().strip() or None
 
 def huggingface_loader(dataset_name, root_data_dir="bitagent.data", split="train", name=None):
+    """
+    Loads a HF dataset through a revision-pinned local copy.
+
+    The Arrow files saved under `root_data_dir` are reused as long as the hub's commit sha matches the one they
+    were saved from (or the hub can't be reached), otherwise that exact revision is downloaded and saved.
+    """
     bt.logging.debug(f"Loading {dataset_name}")
     dataset_dir = f"{root_data_dir}/{dataset_name.replace('/','_')}"
-    if os.path.exists(f"{dataset_dir}/state.json") and dataset_name != "BitAgent/tool_shuffle_small":
-        bt.logging.debug(f"Loading from disk ({dataset_dir}) ...")
+    local_revision = read_local_revision(dataset_dir)
+    revision = get_dataset_revision(dataset_name)
+    has_local_copy = os.path.exists(f"{dataset_dir}/state.json")
+
+    if has_local_copy and (revision is None or revision == local_revision):
+        bt.logging.debug(f"Loading from disk ({dataset_dir}, revision {local_revision}) ...")
         ds = load_from_disk(dataset_dir)
     else:
-        bt.logging.debug("Loading from web ...") 
-        ds = load_dataset(dataset_name, split=split, download_mode="force_redownload", name=name, token=os.getenv("HF_TOKEN", None))
-        ds.save_to_disk(dataset_dir)
+        bt.logging.debug(f"Loading from web (revision {revision}) ...")
+        ds = load_dataset(dataset_name, split=split, revision=revision, name=name, token=os.getenv("HF_TOKEN", None))
+        # save next to the old copy and swap, the old Arrow files may still be memory mapped
+        tmp_dir = f"{dataset_dir}.tmp"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        ds.save_to_disk(tmp_dir)
+        if revision:
+            with open(f"{tmp_dir}/{REVISION_FILE_NAME}", "w") as f:
+                f.write(revision)
+        if os.path.exists(dataset_dir):
+            shutil.rmtree(dataset_dir)
+        os.replace(tmp_dir, dataset_dir)
+        ds = load_from_disk(dataset_dir)
     bt.logging.debug("Loaded.")
     return ds
 
 def load_bfcl_dataset(dataset_name, root_data_dir="bitagent.data", split="train", name=None):
-    snapshot_download(repo_id=dataset_name, allow_patterns="*.json", repo_type="dataset", local_dir="bitagent.data/bfcl/")
+    snapshot_download(repo_id=dataset_name, allow_patterns="*.json", repo_type="dataset", local_dir=f"{BFCL_DIR}/")
 
     return ShuffledJSONDatasetIterator()
\ No newline at end of file
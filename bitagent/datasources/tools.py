@@ -10,6 +10,7 @@ from bitagent.schemas.tool import Tool
 from bitagent.schemas.chat import ChatMessage, messages_from_list
 from bitagent.datasources.loaders import huggingface_loader, load_bfcl_dataset
 from bitagent.helpers.string_parse import parse_multiple_space_sep_json
+from bitagent.helpers.permutation import EpochPermutationIterator
 
 
 def split_dialogue(text) -> List[ChatMessage]:
@@ -112,18 +113,18 @@ def add_extra_arguments(tool_call: Dict[str, Any], tools: List[Tool]):
             break
 
 
-def cycle_hf_dataset(dataset, seed=572343):
-    while True:
-        ds_shuf = dataset.shuffle(seed=seed)
-        for item in ds_shuf:
-            yield item
+def cycle_hf_dataset(dataset, seed=572343, epoch=0, position=0):
+    # a fresh keyed permutation per pass instead of dataset.shuffle(), rows are read by index
+    for index in EpochPermutationIterator(len(dataset), seed, epoch=epoch, position=position):
+        yield dataset[index]
 
 class ToolDataset(Iterator):
-    def __init__(self, task_dataset_flag=False, seed=572343):
+    def __init__(self, task_dataset_flag=False, seed=572343, dataset=None):
         super().__init__()
         random.seed(seed)
-        # Always load the "BitAgent/tool_shuffle_small" dataset
-        bitagent_ds = huggingface_loader("BitAgent/tool_shuffle_small")
+        # Always use the "BitAgent/tool_shuffle_small" dataset, pass `dataset` to share one loaded table
+        # between several ToolDatasets - each keeps its own cursor
+        bitagent_ds = dataset if dataset is not None else huggingface_loader("BitAgent/tool_shuffle_small")
         # Wrap it in an infinite-cycle generator
         if task_dataset_flag:
             self.bitagent_iter = cycle(bitagent_ds)
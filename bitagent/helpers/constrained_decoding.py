@@ -0,0 +1,113 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import re
+
+# value patterns for the python-literal argument values ast.literal_eval accepts
+STRING_RE = r'(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')'
+INT_RE = r'-?\d+'
+NUMBER_RE = r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?'
+BOOL_RE = r'(?:True|False)'
+SCALAR_RE = rf'(?:{STRING_RE}|{NUMBER_RE}|{BOOL_RE}|None)'
+# flat containers only, nesting is not regular
+LIST_RE = rf'\[(?:{SCALAR_RE}(?:, ?{SCALAR_RE})*)?\]'
+DICT_RE = rf'\{{(?:{STRING_RE}: ?{SCALAR_RE}(?:, ?{STRING_RE}: ?{SCALAR_RE})*)?\}}'
+ANY_RE = rf'(?:{SCALAR_RE}|{LIST_RE}|{DICT_RE})'
+
+TYPE_VALUE_RES = {
+    "str": STRING_RE, "string": STRING_RE,
+    "int": INT_RE, "integer": INT_RE,
+    "float": NUMBER_RE, "number": NUMBER_RE,
+    "bool": BOOL_RE, "boolean": BOOL_RE,
+    "list": LIST_RE, "array": LIST_RE, "tuple": LIST_RE,
+    "dict": DICT_RE, "object": DICT_RE,
+}
+
+# a sentence explaining that no function applies, which ast.parse rejects
+NO_CALL_RE = r'[A-Za-z][^\[\]()\n]* [^\[\]()\n]*'
+
+def _tool_name_and_arguments(tool):
+    if isinstance(tool, dict):
+        return tool.get("name", ""), tool.get("arguments", {}) or {}
+    return tool.name, getattr(tool, "arguments", {}) or {}
+
+def _value_re(arg_info):
+    arg_type = arg_info.get("type", "") if isinstance(arg_info, dict) else ""
+    return TYPE_VALUE_RES.get(str(arg_type).lower(), ANY_RE)
+
+def tool_call_regex(tools) -> str:
+    """
+    Regex for `[func_name(arg=value, ...), ...]` restricted to the given tools: only their function names,
+    their argument names and values matching each argument's type. Also allows a plain sentence for
+    when no function applies. Returns None when there are no tools to constrain to.
+    """
+    if not isinstance(tools, list):
+        return None
+    calls = []
+    for tool in tools:
+        name, arguments = _tool_name_and_arguments(tool)
+        if not name:
+            continue
+        if arguments:
+            arg_res = [
+                f"{re.escape(arg_name)}={_value_re(arg_info)}"
+                for arg_name, arg_info in arguments.items()
+            ]
+            arg_re = "(?:" + "|".join(arg_res) + ")"
+            calls.append(rf"{re.escape(name)}\((?:{arg_re}(?:, ?{arg_re})*)?\)")
+        else:
+            calls.append(rf"{re.escape(name)}\(\)")
+    if not calls:
+        return None
+    call_re = "(?:" + "|".join(calls) + ")"
+    return rf"(?:\[{call_re}(?:, ?{call_re})*\]|{NO_CALL_RE})"
+
+def call_expression_end(text: str):
+    """
+    Index just past the first complete call expression at the start of `text`, either `[...]` or
+    `name(...)`, or None if the expression has not closed yet (or `text` is not a call at all).
+    Brackets inside string literals are ignored.
+    """
+    i = len(text) - len(text.lstrip())
+    if i == len(text):
+        return None
+    if text[i] != "[":
+        match = re.match(r"[A-Za-z_][\w.]*\(", text[i:])
+        if not match:
+            return None
+
+    depth = 0
+    quote = None
+    escaped = False
+    for j in range(i, len(text)):
+        c = text[j]
+        if quote:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+            if depth == 0:
+                return j + 1
+    return None
@@ -16,22 +16,48 @@
 # DEALINGS IN THE SOFTWARE.
 
 import json
+import httpx
+import hashlib
+from collections import OrderedDict
 import bittensor as bt
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from bitagent.helpers.constrained_decoding import tool_call_regex, call_expression_end
 
-# specifically for the validator
-def get_openai_llm(self, hugging_face=False):
+def get_openai_base_url(self, hugging_face=False):
     if "validator" in self.__class__.__name__.lower() and hugging_face and self.config.validator_hf_server_port:
         # stand up a vLLM server on this port for the OFFLINE HF model evals
-        base_url = f'http://localhost:{self.config.validator_hf_server_port}/v1'
-    else:
-        base_url = self.config.openai_api_base
+        return f'http://localhost:{self.config.validator_hf_server_port}/v1'
+    return self.config.openai_api_base
 
+# specifically for the validator
+def get_openai_llm(self, hugging_face=False):
     return OpenAI(
         api_key=self.config.openai_api_key,
-        base_url=base_url
+        base_url=get_openai_base_url(self, hugging_face)
     )
 
+def get_async_openai_llm(self, hugging_face=False):
+    """
+    Long-lived AsyncOpenAI client per base url, cached on the neuron.
+    Reusing one client keeps its keep-alive connection pool warm across requests.
+    """
+    base_url = get_openai_base_url(self, hugging_face)
+    if not hasattr(self, "async_openai_clients"):
+        self.async_openai_clients = {}
+    if base_url not in self.async_openai_clients:
+        max_connections = getattr(self.config, "miner_llm_max_connections", None) or 64
+        self.async_openai_clients[base_url] = AsyncOpenAI(
+            api_key=self.config.openai_api_key,
+            base_url=base_url,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                )
+            ),
+        )
+    return self.async_openai_clients[base_url]
+
 def system_prompt(tools):
     prompt = """You are an expert in composing functions. You are given a question and a set of possible functions. Based on the question, you will need to make one or more function/tool calls to achieve the purpose.
     If none of the function can be used, point it out. If the given question lacks the parameters required by the function, also point it out.
@@ -46,46 +72,69 @@ def system_prompt(tools):
     return prompt.format(functions=tools)
 
 
-def llm(self, messages, tools, model_name, hugging_face=False, max_new_tokens=160, temperature=0):
-    
-    if not isinstance(tools, str):
-        if isinstance(tools, list):
-            tools_jsonable = []
-            for t in tools:
-                if isinstance(t, dict):
-                    tools_jsonable.append(t)
-                else:
-                    tool_data = {
-                        "name": t.name,
-                        "description": getattr(t, "description", ""),
-                        "arguments": getattr(t, "arguments", {}),
-                    }
-                    tools_jsonable.append(tool_data)
-            tools_str = json.dumps(tools_jsonable, indent=2)
+# rendered system prompts keyed by a hash of the canonical tools json
+SYSTEM_PROMPT_CACHE_SIZE = 1024
+system_prompt_cache = OrderedDict()
+
+def tools_to_jsonable(tools):
+    tools_jsonable = []
+    for t in tools:
+        if isinstance(t, dict):
+            tools_jsonable.append(t)
         else:
-            tools_str = json.dumps(tools, indent=2)
+            tool_data = {
+                "name": t.name,
+                "description": getattr(t, "description", ""),
+                "arguments": getattr(t, "arguments", {}),
+            }
+            tools_jsonable.append(tool_data)
+    return tools_jsonable
+
+def canonical_tools_json(tools):
+    """
+    Compact json of the tools with sorted keys, tools ordered by name.
+    The same tool set always renders to the same bytes, so the inference server can reuse its prefix cache.
+    """
+    if isinstance(tools, str):
+        return tools
+    if isinstance(tools, list):
+        tools = sorted(tools_to_jsonable(tools), key=lambda t: str(t.get("name", "")))
+    return json.dumps(tools, sort_keys=True, separators=(",", ":"), default=str)
+
+def cached_system_prompt(tools):
+    tools_str = canonical_tools_json(tools)
+    key = hashlib.sha256(tools_str.encode("utf-8")).hexdigest()
+    prompt_str = system_prompt_cache.get(key)
+    if prompt_str is None:
+        prompt_str = system_prompt(tools_str)
+        system_prompt_cache[key] = prompt_str
+        if len(system_prompt_cache) > SYSTEM_PROMPT_CACHE_SIZE:
+            system_prompt_cache.popitem(last=False)
     else:
-        tools_str = tools
+        system_prompt_cache.move_to_end(key)
+    return prompt_str
+
+def build_chat_messages(messages, tools):
+    """Chat messages to send, with the tools system prompt prepended to the first message. Does not modify `messages`."""
+    prompt_str = cached_system_prompt(tools)
+    chat_messages = [{"role": m.role, "content": m.content} for m in messages]
+    chat_messages[0]["content"] = prompt_str + "\n\n" + str(messages[0].content)
+    return chat_messages
 
-    prompt_str = system_prompt(tools_str)
 
+def llm(self, messages, tools, model_name, hugging_face=False, max_new_tokens=160, temperature=0):
+    
     if len(messages) == 0:
         bt.logging.error("No messages found. Returning empty response.")
         return ""
-    original_content = messages[0].content
-    messages[0].content = prompt_str + "\n\n" + str(original_content)
-
-    # for idx, m in enumerate(messages):
-    #     print(f"Msg {idx} (role={m.role}): {m.content}")
-    # print("\n")
+    chat_messages = build_chat_messages(messages, tools)
 
-    
     try:
         if "@" in model_name:
             bt.logging.error("Parsing issue with model name, commit still present. Passing...")
         else:
             response = get_openai_llm(self, hugging_face).chat.completions.create(
-                messages=[{"role": m.role, "content": m.content} for m in messages],
+                messages=chat_messages,
                 max_tokens=max_new_tokens,
                 model=model_name,
                 temperature=0
@@ -97,4 +146,91 @@ def llm(self, messages, tools, model_name, hugging_face=False, max_new_tokens=16
     if hugging_face:
         return response.choices[0].message.content.strip(), response.choices[0].finish_reason
     else:
-        return response.choices[0].message.content.strip()
\ No newline at end of file
+        return response.choices[0].message.content.strip()
+
+
+async def allm(self, messages, tools, model_name, max_new_tokens=160, temperature=0, constrained=False):
+    """
+    Awaitable llm() for the miner, so concurrent queries overlap on the axon event loop.
+
+    With `constrained`, generation is guided by a regex built from the tools (vLLM `guided_regex`) and the
+    stream is cut as soon as the call expression closes.
+    """
+    if constrained:
+        chunks = [
+            chunk async for chunk in astream_llm(
+                self, messages, tools, model_name, max_new_tokens, temperature, constrained=True
+            )
+        ]
+        return "".join(chunks).strip()
+
+    if len(messages) == 0:
+        bt.logging.error("No messages found. Returning empty response.")
+        return ""
+    chat_messages = build_chat_messages(messages, tools)
+
+    if "@" in model_name:
+        bt.logging.error("Parsing issue with model name, commit still present. Passing...")
+        return ""
+    try:
+        response = await get_async_openai_llm(self).chat.completions.create(
+            messages=chat_messages,
+            max_tokens=max_new_tokens,
+            model=model_name,
+            temperature=temperature
+        )
+    except Exception as e:
+        bt.logging.error(f"Error calling to LLM: {e}")
+        return ""
+
+    return response.choices[0].message.content.strip()
+
+
+async def astream_llm(self, messages, tools, model_name, max_new_tokens=160, temperature=0, constrained=False):
+    """
+    Yields the completion text as it is generated and stops as soon as the call expression closes.
+    With `constrained`, generation is also guided by a regex built from the tools (vLLM `guided_regex`).
+    """
+    if len(messages) == 0:
+        bt.logging.error("No messages found. Returning empty response.")
+        return
+    chat_messages = build_chat_messages(messages, tools)
+
+    if "@" in model_name:
+        bt.logging.error("Parsing issue with model name, commit still present. Passing...")
+        return
+    request = dict(
+        messages=chat_messages,
+        max_tokens=max_new_tokens,
+        model=model_name,
+        temperature=temperature,
+        stream=True,
+    )
+    if constrained:
+        regex = tool_call_regex(tools)
+        if regex:
+            request["extra_body"] = {"guided_regex": regex}
+
+    try:
+        stream = await get_async_openai_llm(self).chat.completions.create(**request)
+    except Exception as e:
+        bt.logging.error(f"Error calling to LLM: {e}")
+        return
+
+    text = ""
+    try:
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            delta = chunk.choices[0].delta.content
+            end = call_expression_end(text + delta)
+            if end is not None:
+                yield delta[:end - len(text)]
+                break
+            text += delta
+            yield delta
+    except Exception as e:
+        bt.logging.error(f"Error streaming from LLM: {e}")
+    finally:
+        # closing the stream aborts the request on the server
+        await stream.close()
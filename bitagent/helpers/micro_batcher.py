@@ -0,0 +1,96 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+import heapq
+import asyncio
+import inspect
+import itertools
+import bittensor as bt
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for a short window and dispatches them, highest priority first,
+    through a bounded number of concurrent workers.
+
+    Each request carries a deadline (in time.monotonic() seconds). Requests whose deadline has
+    passed before they start are dropped and returned unprocessed, and requests still running
+    at their deadline are cancelled, so no LLM time is spent on answers nobody is waiting for.
+    """
+
+    def __init__(self, process_fn, window: float = 0.005, max_concurrency: int = 8):
+        self.process_fn = process_fn
+        self.window = window
+        self.max_concurrency = max(1, max_concurrency)
+
+        self.queue = []  # heap of (-priority, seq, deadline, item, future)
+        self.seq = itertools.count()
+        self.wakeup = None
+        self.workers = []
+
+        self.dropped = 0
+        self.timed_out = 0
+
+    def _ensure_workers(self):
+        # asyncio primitives are created lazily so they bind to the axon's event loop
+        if self.wakeup is None:
+            self.wakeup = asyncio.Event()
+        self.workers = [w for w in self.workers if not w.done()]
+        while len(self.workers) < self.max_concurrency:
+            self.workers.append(asyncio.ensure_future(self._worker()))
+
+    async def submit(self, item, priority: float = 0.0, deadline: float = None):
+        """Queue `item` and wait for process_fn(item); returns `item` unprocessed if its deadline passes first."""
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queue, (-priority, next(self.seq), deadline, item, future))
+        self.wakeup.set()
+        return await future
+
+    async def _worker(self):
+        while True:
+            await self.wakeup.wait()
+            # let concurrent arrivals land so they are ordered together
+            await asyncio.sleep(self.window)
+            while self.queue:
+                _, _, deadline, item, future = heapq.heappop(self.queue)
+                if future.done():
+                    continue
+                await self._run(item, deadline, future)
+            self.wakeup.clear()
+
+    async def _run(self, item, deadline, future):
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            self.dropped += 1
+            bt.logging.debug(f"MicroBatcher: dropping request past its deadline ({self.dropped} dropped so far)")
+            future.set_result(item)
+            return
+        try:
+            result = self.process_fn(item)
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, timeout=remaining)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            bt.logging.debug(f"MicroBatcher: request hit its deadline while running ({self.timed_out} so far)")
+            result = item
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,94 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import hashlib
+
+FEISTEL_ROUNDS = 4
+MASK64 = (1 << 64) - 1
+
+def derive_key(seed, epoch: int) -> int:
+    digest = hashlib.blake2b(f"{seed}:{epoch}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def _mix64(x: int) -> int:
+    # splitmix64 finalizer
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+class KeyedPermutation:
+    """
+    Pseudorandom bijection over [0, n) from a key, in O(1) memory.
+
+    A balanced Feistel network permutes [0, 2^(2*half_bits)) and cycle-walking maps it back onto [0, n),
+    so index i can be permuted without materializing the whole order.
+    """
+
+    def __init__(self, n: int, key: int):
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        self.n = n
+        self.half_bits = max(1, ((max(n - 1, 1)).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        self.round_keys = [_mix64(key + r * 0x9E3779B97F4A7C15 & MASK64) for r in range(FEISTEL_ROUNDS)]
+
+    def __len__(self):
+        return self.n
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self.half_bits, x & self.half_mask
+        for round_key in self.round_keys:
+            left, right = right, left ^ (_mix64(right ^ round_key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+class EpochPermutationIterator:
+    """
+    Endless iterator over indices in [0, n), a fresh keyed permutation per epoch.
+
+    `epoch` and `position` fully describe the cursor, save them with `state()` and pass them back in to resume.
+    """
+
+    def __init__(self, n: int, seed, epoch: int = 0, position: int = 0):
+        if n <= 0:
+            raise ValueError("cannot iterate an empty range")
+        self.n = n
+        self.seed = seed
+        self.epoch = epoch
+        self.position = position
+        self.permutation = KeyedPermutation(n, derive_key(seed, epoch))
+
+    def state(self) -> dict:
+        return {"epoch": self.epoch, "position": self.position}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        if self.position >= self.n:
+            self.epoch += 1
+            self.position = 0
+            self.permutation = KeyedPermutation(self.n, derive_key(self.seed, self.epoch))
+        index = self.permutation[self.position]
+        self.position += 1
+        return index
@@ -0,0 +1,65 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+import hashlib
+import bittensor as bt
+from cachetools import TTLCache
+from bitagent.helpers.llms import canonical_tools_json
+
+def task_cache_key(messages, tools, model_name: str) -> str:
+    """
+    Hash of a task that ignores tool order and dict key order, so the same
+    conversation and tool set always map to the same key.
+    """
+    messages_json = json.dumps(
+        [{"role": str(m.role), "content": m.content} for m in messages],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    payload = "\x1f".join([model_name, messages_json, canonical_tools_json(tools)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """Bounded TTL cache of miner responses with hit-rate metrics."""
+
+    def __init__(self, maxsize: int, ttl: float, log_every: int = 100):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.log_every = log_every
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str):
+        response = self.cache.get(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        if (self.hits + self.misses) % self.log_every == 0:
+            bt.logging.info(
+                f"Response cache: {self.hits} hits, {self.misses} misses, hit rate {self.hit_rate:.1%}, {len(self.cache)} entries"
+            )
+        return response
+
+    def put(self, key: str, response: str):
+        # empty responses are LLM errors, don't pin them
+        if response:
+            self.cache[key] = response
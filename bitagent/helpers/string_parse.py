@@ -8,27 +8,29 @@ def extract_text_inside_quotes(s):
     else:
         return s  # Returns the original string if no double quotes are found
 
+_json_decoder = json.JSONDecoder()
+# decode errors count the lines before the error position, so the text in front of the cursor is dropped now and then
+_REBASE_CHARS = 1 << 16
+
 def parse_multiple_space_sep_json(json_str):
     """
     Parses a string containing multiple JSON objects separated by whitespace.
     
     {} {} -> [{},{}]
+
+    One shared decoder works from offsets into the string instead of a slice per attempt. After a malformed
+    object parsing resumes at the next '{' after its start, so objects nested in or following a truncated one are still found.
     """
     results = []
-    start = 0
-    json_str = json_str.strip()  # Remove leading and trailing whitespace
-    while start < len(json_str):
-        # Find the start of a JSON object
-        start = json_str.find('{', start)
-        if start == -1:  # No more JSON object
-            break
+    start = json_str.find('{')
+    while start != -1:
+        if start > _REBASE_CHARS:
+            json_str = json_str[start:]
+            start = 0
         try:
-            obj, index = json.JSONDecoder().raw_decode(json_str[start:])
+            obj, start = _json_decoder.raw_decode(json_str, start)
             results.append(obj)
-            start += index
-            while start < len(json_str) and json_str[start] in ' \t\n\r':  # Skip whitespace
-                start += 1
         except json.JSONDecodeError:
-            # Move start forward and try again
             start += 1
+        start = json_str.find('{', start)
     return results
@@ -0,0 +1,76 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+from typing import List
+from collections import OrderedDict
+from bitagent.schemas.tool import Tool
+
+TOOL_REGISTRY_SIZE = 16384
+
+class ToolRegistry:
+    """
+    LRU of tool definitions keyed by Tool.content_hash, shared by the validator (to intern tools it sends and
+    answer GetTools) and the miner (to resolve QueryTask.tool_hashes without re-receiving the definitions).
+    """
+
+    def __init__(self, maxsize: int = TOOL_REGISTRY_SIZE):
+        self.tools = OrderedDict()
+        self.maxsize = maxsize
+
+    def __len__(self):
+        return len(self.tools)
+
+    def add(self, tools: List[Tool]) -> List[str]:
+        hashes = []
+        for tool in tools:
+            tool_hash = tool.content_hash()
+            self.tools[tool_hash] = tool
+            self.tools.move_to_end(tool_hash)
+            hashes.append(tool_hash)
+        while len(self.tools) > self.maxsize:
+            self.tools.popitem(last=False)
+        return hashes
+
+    def get(self, tool_hash: str):
+        tool = self.tools.get(tool_hash)
+        if tool is not None:
+            self.tools.move_to_end(tool_hash)
+        return tool
+
+    def missing(self, tool_hashes: List[str]) -> List[str]:
+        return [h for h in dict.fromkeys(tool_hashes) if h not in self.tools]
+
+    def resolve(self, tool_hashes: List[str]) -> List[Tool]:
+        """Tools for the hashes, in order - raises KeyError if any are unknown."""
+        tools = []
+        for tool_hash in tool_hashes:
+            tool = self.get(tool_hash)
+            if tool is None:
+                raise KeyError(tool_hash)
+            tools.append(tool)
+        return tools
+
+    def resolve_or(self, tool_hashes: List[str], fallback: List[Tool]) -> List[Tool]:
+        """Tools for the hashes, in order, or `fallback` (e.g. the tools sent inline) if any hash is unknown."""
+        try:
+            return self.resolve(tool_hashes)
+        except KeyError:
+            return fallback
+
+    def intern(self, synapse):
+        """Copy of a QueryTask that carries tool hashes instead of tool definitions."""
+        tool_hashes = self.add(synapse.tools)
+        return synapse.model_copy(update={"tools": [], "tool_hashes": tool_hashes})
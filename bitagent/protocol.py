@@ -16,10 +16,15 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import json
+import codecs
 from typing import Optional, List
 import bittensor as bt
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
 from bitagent.schemas.chat import ChatMessage
 from bitagent.schemas.tool import Tool
+from bitagent.helpers.constrained_decoding import call_expression_end
 
 class QueryTask(bt.Synapse):
     """
@@ -29,6 +34,7 @@ class QueryTask(bt.Synapse):
     Attributes:
     - messages: a list of ChatMessage (see bitagent/schemas) - will be used for every task except Tool Gen
     - tools: list of tools {name, description, arguments } in a List of dicts
+    - tool_hashes: optional content hashes (Tool.content_hash) sent instead of `tools`, the miner resolves them locally or through GetTools
     - repsonse: string (e.g., tool_name(arg1=value1, arg2=value2))
     - hf_run_model_name: string representing the HF model the miner is running
     """
@@ -36,12 +42,165 @@ class QueryTask(bt.Synapse):
     # Required request input, filled by sending dendrite caller.
     tools: List[Tool] = []
     messages: List[ChatMessage] = []
+    tool_hashes: List[str] = []
 
     # Optional request output, filled by recieving axon.
     response: str = ""
     hf_run_model_name: str = "N/A"
     competition_version: Optional[str] = None
 
+class BatchedTask(BaseModel):
+    """
+    One task within a QueryTaskBatch.
+
+    Attributes:
+    - messages: a list of ChatMessage for this task
+    - tool_ids: indices into the batch's shared tool table
+    """
+    messages: List[ChatMessage] = []
+    tool_ids: List[int] = []
+
+class QueryTaskBatch(bt.Synapse):
+    """
+    Many QueryTasks in one request, so a scoring round costs one round-trip per miner instead of one per task.
+    Tools shared between tasks are sent once in `tools` and referenced by index from each task.
+
+    Attributes:
+    - tools: deduplicated tool table shared by all tasks
+    - tasks: list of BatchedTask (messages + tool_ids)
+    - responses: one response string per task, in task order
+    - hf_run_model_name: string representing the HF model the miner is running
+    """
+
+    # Required request input, filled by sending dendrite caller.
+    tools: List[Tool] = []
+    tasks: List[BatchedTask] = []
+
+    # Optional request output, filled by recieving axon.
+    responses: List[str] = []
+    hf_run_model_name: str = "N/A"
+    competition_version: Optional[str] = None
+
+    @classmethod
+    def from_query_tasks(cls, query_tasks: List[QueryTask], **kwargs) -> "QueryTaskBatch":
+        tools = []
+        tool_index = {}
+        tasks = []
+        for query_task in query_tasks:
+            tool_ids = []
+            for tool in query_task.tools:
+                key = json.dumps(tool.to_dict(), sort_keys=True)
+                if key not in tool_index:
+                    tool_index[key] = len(tools)
+                    tools.append(tool)
+                tool_ids.append(tool_index[key])
+            tasks.append(BatchedTask(messages=query_task.messages, tool_ids=tool_ids))
+        return cls(tools=tools, tasks=tasks, **kwargs)
+
+    def to_query_tasks(self) -> List[QueryTask]:
+        """
+        Splits the batch back into QueryTasks (with responses and terminal info) so each can be handled on its own.
+
+        Each task gets the batch's process time divided by the number of tasks, its share of the round-trip.
+        A task whose tool_ids don't index the tool table comes back with no tools and an empty response, so it scores as a failure.
+        A batch whose responses don't line up one to one with its tasks is rejected, every task comes back with an empty response.
+        """
+        process_time = self.dendrite.process_time if self.dendrite else None
+        dendrite = self.dendrite
+        if dendrite is not None and process_time and self.tasks:
+            dendrite = dendrite.model_copy(update={"process_time": process_time / len(self.tasks)})
+        responses = self.responses if len(self.responses) == len(self.tasks) else [""] * len(self.tasks)
+        query_tasks = []
+        for task, response in zip(self.tasks, responses):
+            valid = all(0 <= t < len(self.tools) for t in task.tool_ids)
+            query_tasks.append(QueryTask(
+                messages=task.messages,
+                tools=[self.tools[t] for t in task.tool_ids] if valid else [],
+                response=response if valid and response else "",
+                hf_run_model_name=self.hf_run_model_name,
+                competition_version=self.competition_version,
+                timeout=self.timeout,
+                dendrite=dendrite,
+                axon=self.axon,
+            ))
+        return query_tasks
+
+    def same_tasks(self, other: "QueryTaskBatch") -> bool:
+        """Whether `other` carries the same tool table and tasks, e.g. a miner's response against the batch sent."""
+        return self.model_dump(include={"tools", "tasks"}) == other.model_dump(include={"tools", "tasks"})
+
+    def deserialize(self) -> List[str]:
+        return self.responses
+
+class StreamingQueryTask(bt.StreamingSynapse):
+    """
+    Streaming variant of QueryTask - the miner streams the response text as it is generated.
+
+    The validator parses the stream incrementally and stops reading (closing the connection) as soon as a
+    complete call expression has arrived, so latency is measured to the complete call rather than to the end of the stream.
+
+    Attributes:
+    - messages, tools, response, hf_run_model_name, competition_version: as in QueryTask
+    - call_complete: set by the validator once `response` holds a complete call expression
+    - time_to_call: seconds from sending the request to the complete call expression, set by the validator
+    """
+
+    # Required request input, filled by sending dendrite caller.
+    tools: List[Tool] = []
+    messages: List[ChatMessage] = []
+
+    # Optional request output, filled by recieving axon.
+    response: str = ""
+    hf_run_model_name: str = "N/A"
+    competition_version: Optional[str] = None
+
+    # Filled by the validator while reading the stream.
+    call_complete: bool = False
+    time_to_call: Optional[float] = None
+
+    async def process_streaming_response(self, response: StreamingResponse):
+        """Accumulates streamed text into `response`, returning early once a complete call expression has arrived."""
+        self.response = ""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        async for chunk in response.content.iter_any():
+            text = decoder.decode(chunk)
+            if not text:
+                continue
+            self.response += text
+            end = call_expression_end(self.response)
+            if end is not None:
+                self.response = self.response[:end]
+                self.call_complete = True
+            yield text
+            if self.call_complete:
+                return
+
+    def deserialize(self) -> str:
+        return self.response
+
+    def extract_response_json(self, response: StreamingResponse) -> dict:
+        headers = {
+            k.decode("utf-8"): v.decode("utf-8")
+            for k, v in response.__dict__["_raw_headers"]
+        }
+
+        def extract_info(prefix):
+            return {
+                key.split("_")[-1]: value
+                for key, value in headers.items()
+                if key.startswith(prefix)
+            }
+
+        return {
+            "name": headers.get("name", ""),
+            "timeout": float(headers.get("timeout", 0)),
+            "total_size": int(headers.get("total_size", 0)),
+            "header_size": int(headers.get("header_size", 0)),
+            "dendrite": extract_info("bt_header_dendrite"),
+            "axon": extract_info("bt_header_axon"),
+            "response": self.response,
+        }
+
 class QueryResult(bt.Synapse):
     """
     Provide feedback on last task request from validator to inform Miner of performance.
@@ -51,6 +210,11 @@ class QueryResult(bt.Synapse):
     """
     results: str
 
+# Miner calls this on the validator to fetch tool definitions it has not seen yet for QueryTask.tool_hashes
+class GetTools(bt.Synapse):
+    tool_hashes: List[str] = []
+    tools: List[Tool] = []
+
 class IsAlive(bt.Synapse):
     response: bool = False
 
@@ -1,3 +1,5 @@
+import json
+import hashlib
 from pydantic import BaseModel
 from typing import Dict, Any, List
 
@@ -14,6 +16,11 @@ class Tool(BaseModel):
     
     def to_dict(self):
         return self.dict()
+
+    def content_hash(self) -> str:
+        """Content address of the tool definition, independent of argument dict order."""
+        payload = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
     
     
 class ToolCall(BaseModel):
@@ -0,0 +1,171 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import glob
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+from bitagent.helpers.permutation import KeyedPermutation, derive_key
+
+# BFCL score files start with a header line holding the category's accuracy and counts
+SCORE_HEADER_KEYS = ("correct_count", "total_count")
+
+# How BFCL's leaderboard CSV builds "Overall Acc" from category accuracies: an unweighted mean of the
+# non-live, live and multi-turn summaries, each an unweighted mean of its members or one weighted by test case count.
+# A category that wasn't run still counts, at accuracy 0.
+BFCL_OVERALL_GROUPS = ("unweighted", (
+    ("unweighted", (("unweighted", ("simple", "java", "javascript")), "multiple", "parallel", "parallel_multiple", "irrelevance")),
+    ("weighted", ("live_simple", "live_multiple", "live_parallel", "live_parallel_multiple", "live_irrelevance", "live_relevance")),
+    ("unweighted", ("multi_turn_base", "multi_turn_miss_func", "multi_turn_miss_param", "multi_turn_long_context")),
+))
+
+def load_bfcl_case_ids(data_dir: str, categories: List[str], version_prefix: str = "BFCL_v3") -> Dict[str, List[str]]:
+    """Test case ids per category, read from BFCL's prompt files."""
+    case_ids = {}
+    for category in categories:
+        path = os.path.join(data_dir, f"{version_prefix}_{category}.json")
+        with open(path, "r") as f:
+            case_ids[category] = [json.loads(line)["id"] for line in f if line.strip()]
+    return case_ids
+
+def find_bfcl_data_dir(venv_path: str) -> Optional[str]:
+    """BFCL's data directory, from the editable checkout or the venv's site-packages."""
+    candidates = glob.glob("third_party/gorilla_*/berkeley-function-call-leaderboard/bfcl/data") \
+        + glob.glob(f"{venv_path}/lib/python*/site-packages/bfcl/data")
+    return candidates[0] if candidates else None
+
+def _group_weights(group, category_sizes: Dict[str, int]) -> Tuple[Dict[str, float], int]:
+    if isinstance(group, str):
+        return {group: 1.0}, category_sizes.get(group, 0)
+    how, members = group
+    members = [_group_weights(member, category_sizes) for member in members]
+    size = sum(member_size for _, member_size in members)
+    weights = {}
+    for member_weights, member_size in members:
+        share = member_size / size if how == "weighted" and size else 1 / len(members)
+        for category, weight in member_weights.items():
+            weights[category] = weight * share
+    return weights, size
+
+def bfcl_overall_weights(category_sizes: Dict[str, int]) -> Dict[str, float]:
+    """
+    Weight of each category's accuracy in BFCL's overall accuracy, summing to 1 over every category BFCL reports.
+    As in BFCL, categories that aren't run (not in `category_sizes`) keep their weight and count as 0, so the weights
+    of the categories run sum to less than 1. BFCL sizes a category that wasn't run by its data file; here it has
+    size 0, which only matters in the weighted live group, and every live category is run.
+    """
+    return _group_weights(BFCL_OVERALL_GROUPS, category_sizes)[0]
+
+class StratifiedSampler:
+    """
+    Draws batches of test cases across categories in proportion to category size, without replacement.
+    Each category is walked in its own keyed permutation so the order is random but reproducible from the seed.
+    """
+
+    def __init__(self, case_ids: Dict[str, List[str]], seed=572343):
+        self.case_ids = {c: ids for c, ids in case_ids.items() if ids}
+        self.total = sum(len(ids) for ids in self.case_ids.values())
+        self.permutations = {c: KeyedPermutation(len(ids), derive_key(seed, c)) for c, ids in self.case_ids.items()}
+        self.drawn = {c: 0 for c in self.case_ids}
+
+    def remaining(self) -> int:
+        return self.total - sum(self.drawn.values())
+
+    def next_batch(self, size: int) -> Dict[str, List[str]]:
+        """Up to `size` new case ids by category, keeping every category's sampled fraction in step."""
+        size = min(size, self.remaining())
+        target_fraction = (sum(self.drawn.values()) + size) / self.total
+        batch = {}
+        for category, ids in self.case_ids.items():
+            target = min(len(ids), math.ceil(target_fraction * len(ids)))
+            take = range(self.drawn[category], target)
+            if take:
+                batch[category] = [ids[self.permutations[category][i]] for i in take]
+                self.drawn[category] = target
+        return batch
+
+class AccuracyEstimate:
+    """
+    Running estimate of overall accuracy, a weighted sum of per-category accuracies (by default each category
+    weighted by its size, `bfcl_overall_weights` for BFCL's overall score, where categories not run add nothing),
+    from per-category samples, with a normal-approximation confidence interval that shrinks to zero as every
+    category is exhausted.
+    """
+
+    def __init__(self, category_sizes: Dict[str, int], z: float = 2.576, weights: Optional[Dict[str, float]] = None):
+        self.category_sizes = category_sizes
+        self.total = sum(category_sizes.values())
+        self.weights = weights if weights is not None else {c: size / self.total for c, size in category_sizes.items()}
+        self.z = z
+        self.counts: Dict[str, Tuple[int, int]] = {}
+
+    def update(self, category: str, correct: int, evaluated: int):
+        self.counts[category] = (correct, evaluated)
+
+    def mean(self) -> float:
+        estimate = 0.0
+        for category, size in self.category_sizes.items():
+            correct, evaluated = self.counts.get(category, (0, 0))
+            # unsampled categories count at 0.5 until their first batch
+            p = correct / evaluated if evaluated else 0.5
+            estimate += self.weights.get(category, 0.0) * p
+        return estimate
+
+    def interval(self) -> Tuple[float, float]:
+        variance = 0.0
+        for category, size in self.category_sizes.items():
+            correct, evaluated = self.counts.get(category, (0, 0))
+            weight = self.weights.get(category, 0.0)
+            if not evaluated:
+                variance += weight ** 2 * 0.25
+                continue
+            # Agresti-Coull style smoothing so a perfect or zero sample still has some spread
+            p = (correct + 2) / (evaluated + 4)
+            finite_population = (size - evaluated) / (size - 1) if size > 1 else 0.0
+            variance += weight ** 2 * p * (1 - p) / evaluated * finite_population
+        half_width = self.z * math.sqrt(variance)
+        mean = self.mean()
+        return max(0.0, mean - half_width), min(1.0, mean + half_width)
+
+def decision_boundary(scored: List[float], top_k: int = 1) -> Optional[float]:
+    """Score a model has to beat to enter the top k of the models scored so far, None until there are k of them."""
+    scores = sorted((s for s in scored if s is not None), reverse=True)
+    if top_k < 1 or len(scores) < top_k:
+        return None
+    return scores[top_k - 1]
+
+def should_stop(interval: Tuple[float, float], boundary: Optional[float], full_run_finalists: bool = False) -> bool:
+    """
+    Whether an adaptive run can stop: the interval is entirely below the boundary, or entirely above it
+    when finalists don't need a full run. Without a boundary every case is run.
+    """
+    if boundary is None:
+        return False
+    low, high = interval
+    return high < boundary or (low > boundary and not full_run_finalists)
+
+def read_bfcl_category_counts(score_dir: str, model_dir_name: str, category: str, version_prefix: str = "BFCL_v3") -> Optional[Tuple[int, int]]:
+    """(correct, evaluated) from the header line of a BFCL category score file, None if it isn't there."""
+    paths = glob.glob(os.path.join(score_dir, model_dir_name, "**", f"{version_prefix}_{category}_score.json"), recursive=True)
+    if not paths:
+        return None
+    with open(paths[0], "r") as f:
+        header = json.loads(f.readline())
+    if not all(k in header for k in SCORE_HEADER_KEYS):
+        return None
+    return int(header["correct_count"]), int(header["total_count"])
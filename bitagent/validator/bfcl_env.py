@@ -0,0 +1,124 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import glob
+import json
+import subprocess
+import bittensor as bt
+from typing import Optional
+
+BFCL_ENV_FILE_NAME = "bfcl_env.json"
+BFCL_PATCH_PATH = os.path.join("third_party", "patches", "bfcl_patch.py")
+
+# run with the venv's python (the patch file as argv[1]), prints one json line describing the BFCL install
+PROBE_SCRIPT = """
+import os, sys, glob, json, importlib, importlib.util
+import bfcl
+try:
+    from importlib.metadata import version
+    bfcl_version = version("bfcl")
+except Exception:
+    bfcl_version = getattr(bfcl, "__version__", None)
+package_dir = os.path.dirname(os.path.abspath(bfcl.__file__))
+data_dir = os.path.join(package_dir, "data")
+categories = sorted(
+    os.path.basename(p)[len("BFCL_v3_"):-len(".json")] for p in glob.glob(os.path.join(data_dir, "BFCL_v3_*.json"))
+)
+
+# apply the BitAgent patch and check its registrations, the same ones apply_bfcl_patch(verbose=True) prints
+patch = {}
+try:
+    spec = importlib.util.spec_from_file_location("bfcl_patch", sys.argv[1])
+    bfcl_patch = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bfcl_patch)
+    bfcl_patch.apply_bfcl_patch()
+    patch["supported_models"] = "BitAgent" in importlib.import_module("bfcl.constants.supported_models").SUPPORTED_MODELS
+    patch["local_inference_model_map"] = "BitAgent" in importlib.import_module("bfcl.constants.model_config").local_inference_model_map
+    eval_runner = importlib.import_module("bfcl.eval_checker.eval_runner")
+    if hasattr(eval_runner, "MODEL_CONFIG_MAPPING"):
+        patch["model_config_mapping"] = "BitAgent" in eval_runner.MODEL_CONFIG_MAPPING
+except Exception as e:
+    patch["error"] = repr(e)
+patched = "error" not in patch and all(patch.values())
+
+print(json.dumps({"version": bfcl_version, "package_dir": package_dir, "data_dir": data_dir, "categories": categories,
+                  "patched": patched, "patch": patch}))
+"""
+
+def newest_mtime(path: str) -> int:
+    """Latest mtime of `path` and the files under it, so edits in place count too (bytecode caches don't)."""
+    newest = os.stat(path).st_mtime_ns
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            try:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+            except FileNotFoundError:
+                pass
+    return newest
+
+def venv_fingerprint(venv_path: str, package_dir: Optional[str] = None) -> str:
+    """
+    Changes whenever packages are installed into or removed from the venv, the BitAgent patch changes, or,
+    given bfcl's `package_dir`, anything in an editable or vendored bfcl checkout is edited.
+    """
+    paths = [venv_path] + sorted(glob.glob(f"{venv_path}/lib/python*/site-packages"))
+    parts = [f"{p}:{os.stat(p).st_mtime_ns}" for p in paths]
+    if os.path.exists(BFCL_PATCH_PATH):
+        parts.append(f"{BFCL_PATCH_PATH}:{os.stat(BFCL_PATCH_PATH).st_mtime_ns}")
+    if package_dir:
+        parts.append(f"{package_dir}:{newest_mtime(package_dir) if os.path.isdir(package_dir) else None}")
+    return ";".join(parts)
+
+def run_probe(venv_path: str) -> dict:
+    result = subprocess.run(
+        [f"{venv_path}/bin/python", "-c", PROBE_SCRIPT, os.path.abspath(BFCL_PATCH_PATH)],
+        capture_output=True, text=True, timeout=300,
+    )
+    if result.returncode != 0:
+        raise Exception(f"BFCL import failed: {result.stderr.strip().splitlines()[-1:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def probe_bfcl_env(venv_path: str, cache_dir: str = "bitagent.data") -> Optional[dict]:
+    """
+    BFCL version, data directory, test categories and BitAgent patch status of the venv, probed once per install.
+    The result is cached in `cache_dir` keyed on the mtimes of the venv, the bfcl package and the patch;
+    None if BFCL can't be imported.
+    """
+    cache_path = os.path.join(cache_dir, BFCL_ENV_FILE_NAME)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == venv_fingerprint(venv_path, cached["env"]["package_dir"]):
+                return cached["env"]
+        except Exception as e:
+            bt.logging.warning(f"Could not read BFCL env cache {cache_path}, probing again: {e}")
+
+    try:
+        env = run_probe(venv_path)
+    except Exception as e:
+        bt.logging.error(f"BFCL environment check failed: {e}")
+        return None
+
+    fingerprint = venv_fingerprint(venv_path, env["package_dir"])
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"fingerprint": fingerprint, "env": env}, f)
+    os.replace(tmp_path, cache_path)
+    return env
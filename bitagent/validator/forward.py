@@ -18,6 +18,7 @@
 import time
 import asyncio
 import numpy as np
+from typing import List
 import bittensor as bt
 from bitagent.protocol import QueryTask
 from common.utils.uids import get_alive_uids
@@ -103,3 +104,18 @@ async def forward(self, synapse: QueryTask=None) -> QueryTask:
     else:
         bt.logging.debug("OFFLINE: Skipping offline for testnet")
 
+async def query_miners_with_task(self, task, miner_uids: List[int]) -> List[QueryTask]:
+    """
+    Sends the task's QueryTask to the miners.
+    With --validator-intern-tools the tools go as hashes, miners fetch any they haven't seen through GetTools.
+    Not called by forward yet, which only runs the offline evaluation.
+    """
+    synapse = task.synapse
+    if self.config.validator_intern_tools:
+        synapse = self.tool_registry.intern(synapse)
+    return await self.dendrite.forward(
+        axons=[self.metagraph.axons[uid] for uid in miner_uids],
+        synapse=synapse,
+        timeout=task.timeout,
+        deserialize=False,
+    )
@@ -22,6 +22,7 @@ import shutil
 import bittensor as bt
 from datetime import datetime
 from bitagent.datasources import ToolDataset
+from bitagent.datasources.loaders import huggingface_loader
 from langchain_openai import ChatOpenAI
 
 # setup validator with wandb
@@ -116,8 +117,10 @@ def clear_wandb_dir(self):
 # provide some capabilities to the task API (LLM, cossim)
 def initiate_validator_local(self):
     #bt.logging.info("Initializing Validator - this may take a while (downloading data and models).")
-    self.tool_dataset = ToolDataset(False, self.seed)
-    self.task_dataset = ToolDataset(True, self.seed)
+    # one load of the dataset, shared by both iterators
+    tool_shuffle_ds = huggingface_loader("BitAgent/tool_shuffle_small")
+    self.tool_dataset = ToolDataset(False, self.seed, dataset=tool_shuffle_ds)
+    self.task_dataset = ToolDataset(True, self.seed, dataset=tool_shuffle_ds)
     self.check_date = ""
     #bt.logging.debug("Initializing Validator - this may take a while (downloading data and models) - loading model ...")
 
@@ -1,9 +1,14 @@
 # model_longevity_fix.py
+import os
+import json
 import datetime
-import time
 import numpy as np
 from huggingface_hub import HfApi
 import bittensor as bt
+from bittensor.core.chain_data.utils import decode_account_id
+
+REGISTRATION_CACHE_FILE_NAME = "registration_blocks.json"
+QUERY_MULTI_BATCH_SIZE = 64  # storage keys per state_queryStorageAt call
 
 # ---------------------------------------------------------------------
 # 1. Helpers to fetch dataset commit history and map to BT blocks
@@ -21,10 +26,15 @@ def get_dataset_commits(repo_id: str):
     ]
 
 
-def estimate_bt_block(ts_utc: datetime.datetime, subtensor):
-    """Estimate Bittensor block from a UTC timestamp."""
-    current_block = subtensor.get_current_block()
-    now = datetime.datetime.now(tz=datetime.timezone.utc)
+def estimate_bt_block(ts_utc: datetime.datetime, subtensor, current_block: int = None, now: datetime.datetime = None):
+    """Estimate Bittensor block from a UTC timestamp.
+
+    Pass `current_block` (and the matching `now`) when estimating many timestamps so the chain is only asked once.
+    """
+    if current_block is None:
+        current_block = subtensor.get_current_block()
+    if now is None:
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
     diff_sec = (now - ts_utc).total_seconds()
     return max(1, current_block - int(diff_sec // 12))  # 12-s target blocks
 
@@ -32,37 +42,118 @@ def estimate_bt_block(ts_utc: datetime.datetime, subtensor):
 # ---------------------------------------------------------------------
 # 2. Helpers to get registration info for all UIDs on a subnet
 # ---------------------------------------------------------------------
-def get_registration_blocks(netuid: int, subtensor):
-    """Get registration blocks for all UIDs in a subnet."""
+def _scale_value(obj):
+    """Unwrap a ScaleType (or pass through an already decoded value)."""
+    return getattr(obj, "value", obj)
+
+
+def get_hotkeys(netuid: int, subtensor):
+    """Get {uid: hotkey} for a subnet with a single query_map."""
+    hotkeys = {}
+    for uid, hotkey in subtensor.substrate.query_map("SubtensorModule", "Keys", [netuid]):
+        hotkey = _scale_value(hotkey)
+        if not isinstance(hotkey, str):
+            hotkey = decode_account_id(hotkey)
+        hotkeys[int(_scale_value(uid))] = hotkey
+    return hotkeys
+
+
+def fetch_registration_blocks(netuid: int, subtensor, uids=None):
+    """Get {uid: registration block} in bulk.
+
+    With no `uids` the whole subnet is read with one query_map, otherwise the
+    requested UIDs are read with batched query_multi calls.
+    """
+    substrate = subtensor.substrate
+    if uids is None:
+        return {
+            int(_scale_value(uid)): int(_scale_value(block))
+            for uid, block in substrate.query_map("SubtensorModule", "BlockAtRegistration", [netuid])
+        }
+
+    uids = list(uids)
+    blocks = {}
+    for i in range(0, len(uids), QUERY_MULTI_BATCH_SIZE):
+        batch = uids[i:i + QUERY_MULTI_BATCH_SIZE]
+        storage_keys = [
+            substrate.create_storage_key("SubtensorModule", "BlockAtRegistration", [netuid, uid])
+            for uid in batch
+        ]
+        for uid, (_, block) in zip(batch, substrate.query_multi(storage_keys)):
+            blocks[uid] = int(_scale_value(block) or 0)
+    return blocks
+
+
+def load_registration_cache(cache_path: str):
+    """Load the {hotkey: {"uid", "block"}} registration cache, empty if missing or unreadable."""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        bt.logging.warning(f"Could not read registration cache {cache_path}, refetching: {e}")
+        return {}
+
+
+def save_registration_cache(cache_path: str, cache: dict):
+    """Persist the registration cache atomically."""
+    if not cache_path:
+        return
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+def get_registration_blocks(netuid: int, subtensor, cache_path: str = None):
+    """Get registration blocks for all UIDs in a subnet.
+
+    Registration blocks only change when a UID is re-registered to a new hotkey, so
+    they are cached by hotkey in `cache_path` and only UIDs whose hotkey changed are refetched.
+    """
     substrate = subtensor.substrate
     current_block = substrate.get_block_number(None)
-    total_neurons = substrate.query("SubtensorModule", "SubnetworkN", [netuid]).value
     avg_block_time = 12
-    result = {}
 
-    bt.logging.info(f"Fetching registration blocks for {total_neurons} neurons in subnet {netuid}...")
-    now = datetime.datetime.now(tz=datetime.timezone.utc)
-    
-    for uid in range(total_neurons):
+    hotkeys = get_hotkeys(netuid, subtensor)
+    bt.logging.info(f"Fetching registration blocks for {len(hotkeys)} neurons in subnet {netuid}...")
+
+    cache = load_registration_cache(cache_path)
+    changed_uids = [
+        uid for uid, hotkey in hotkeys.items()
+        if hotkey not in cache or cache[hotkey]["uid"] != uid
+    ]
+    bt.logging.debug(f"{len(hotkeys) - len(changed_uids)} registration blocks cached, {len(changed_uids)} to fetch")
+
+    fetched = {}
+    if changed_uids:
         try:
-            reg_block = substrate.query(
-                "SubtensorModule", "BlockAtRegistration", [netuid, uid]
-            ).value
-            
-            if reg_block > 0:
-                blocks_ago = current_block - reg_block
-                ts = now - datetime.timedelta(seconds=blocks_ago * avg_block_time)
-                result[uid] = {"block": reg_block, "timestamp": ts}
-                
-            if uid % 10 == 0:  # Log progress every 10 UIDs
-                bt.logging.debug(f"Processed UID {uid}/{total_neurons}")
-                
+            if len(changed_uids) == len(hotkeys):
+                fetched = fetch_registration_blocks(netuid, subtensor)
+            else:
+                fetched = fetch_registration_blocks(netuid, subtensor, uids=changed_uids)
         except Exception as e:
-            bt.logging.error(f"Error getting registration block for UID {uid}: {e}")
-        
-        # Small delay to avoid overwhelming the node
-        time.sleep(0.05)
-    
+            bt.logging.error(f"Error getting registration blocks for {len(changed_uids)} UIDs: {e}")
+
+    # rebuild the cache from the current hotkeys so deregistered hotkeys drop out
+    new_cache = {}
+    for uid, hotkey in hotkeys.items():
+        if uid in fetched:
+            new_cache[hotkey] = {"uid": uid, "block": fetched[uid]}
+        elif hotkey in cache and cache[hotkey]["uid"] == uid:
+            new_cache[hotkey] = cache[hotkey]
+    save_registration_cache(cache_path, new_cache)
+
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    result = {}
+    for entry in new_cache.values():
+        reg_block = entry["block"]
+        if reg_block > 0:
+            blocks_ago = current_block - reg_block
+            ts = now - datetime.timedelta(seconds=blocks_ago * avg_block_time)
+            result[entry["uid"]] = {"block": reg_block, "timestamp": ts}
+
     bt.logging.info(f"Successfully fetched registration blocks for {len(result)} active neurons")
     return result
 
@@ -109,10 +200,14 @@ def apply_registration_cutoff(
     commits.sort(key=lambda x: x["timestamp"])  # oldest→newest
     rv_sorted = sorted(dataset_scores, key=lambda x: datetime.datetime.strptime(x, "%Y%m%d%H"))
 
+    # one chain read for every estimate below
+    current_block = subtensor.get_current_block()
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+
     commit_to_block = {}
     for i, rv in enumerate(rv_sorted):
         if i < len(commits):
-            commit_to_block[rv] = estimate_bt_block(commits[i]["timestamp"], subtensor)
+            commit_to_block[rv] = estimate_bt_block(commits[i]["timestamp"], subtensor, current_block, now)
             bt.logging.debug(f"[model_longevity_fix] Mapped {rv} to block {commit_to_block[rv]}")
         else:
             # Handle case where we have more dataset versions than commits
@@ -120,18 +215,26 @@ def apply_registration_cutoff(
             # Estimate based on the date in rv (format: YYYYMMDDhh)
             try:
                 rv_date = datetime.datetime.strptime(rv, "%Y%m%d%H").replace(tzinfo=datetime.timezone.utc)
-                commit_to_block[rv] = estimate_bt_block(rv_date, subtensor)
+                commit_to_block[rv] = estimate_bt_block(rv_date, subtensor, current_block, now)
                 bt.logging.debug(f"[model_longevity_fix] Estimated block {commit_to_block[rv]} for {rv} from its date")
             except:
                 # If all else fails, use current block (conservative)
-                commit_to_block[rv] = subtensor.get_current_block()
+                commit_to_block[rv] = current_block
                 bt.logging.warning(f"[model_longevity_fix] Using current block for {rv}")
 
     # --- registration info -------------------------------------------
     bt.logging.info("[model_longevity_fix] Fetching registration blocks for all UIDs...")
-    reg_info = get_registration_blocks(netuid, subtensor)
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(state_path)), REGISTRATION_CACHE_FILE_NAME)
+    reg_info = get_registration_blocks(netuid, subtensor, cache_path=cache_path)
     bt.logging.info(f"[model_longevity_fix] Retrieved registration info for {len(reg_info)} UIDs")
 
+    # registration block per uid, 0 where unknown so it never exceeds a cutoff
+    max_len = max(len(vec) for vec in dataset_scores.values())
+    reg_blocks = np.zeros(max_len, dtype=np.int64)
+    for uid, info in reg_info.items():
+        if uid < max_len:
+            reg_blocks[uid] = info["block"]
+
     # --- zero out impossible scores ----------------------------------
     change_count = 0
     for rv, vec in dataset_scores.items():
@@ -141,13 +244,14 @@ def apply_registration_cutoff(
             continue
             
         bt.logging.debug(f"[model_longevity_fix] Processing dataset {rv} with block cutoff {block_cutoff}")
-        
-        for uid, info in reg_info.items():
-            if info["block"] > block_cutoff and uid < len(vec):
-                if vec[uid] != 0.0:  # Only count non-zero changes
-                    bt.logging.debug(f"[model_longevity_fix] Zeroing UID {uid} for dataset {rv} (registered at {info['block']} > cutoff {block_cutoff})")
-                    vec[uid] = 0.0
-                    change_count += 1
+
+        mask = reg_blocks[:len(vec)] > block_cutoff
+        mask &= vec != 0.0  # Only count non-zero changes
+        n_zeroed = int(np.count_nonzero(mask))
+        if n_zeroed:
+            bt.logging.debug(f"[model_longevity_fix] Zeroing UIDs {np.flatnonzero(mask).tolist()} for dataset {rv} (registered after cutoff {block_cutoff})")
+            vec[mask] = 0.0
+            change_count += n_zeroed
 
     bt.logging.info(f"[model_longevity_fix] Made {change_count} corrections across all datasets")
 
@@ -0,0 +1,144 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import json
+import time
+import asyncio
+import threading
+import bittensor as bt
+from typing import Dict, List, Optional
+from huggingface_hub import HfApi
+from huggingface_hub.hf_api import BlobLfsInfo, RepoSibling
+
+METADATA_FILE_NAME = "model_metadata.json"
+
+def card_license(info) -> Optional[str]:
+    """License from the model card, "Unknown" if the card doesn't name one, None if there is no card data."""
+    card_data = getattr(info, "card_data", None)
+    if card_data is None:
+        return None
+    return card_data.get("license", "Unknown")
+
+def sibling_to_dict(sibling) -> dict:
+    lfs = getattr(sibling, "lfs", None)
+    return {
+        "rfilename": sibling.rfilename,
+        "size": sibling.size,
+        "blob_id": sibling.blob_id,
+        "lfs": {"size": lfs.size, "sha256": lfs.sha256, "pointer_size": lfs.pointer_size} if lfs else None,
+    }
+
+def sibling_from_dict(data: dict) -> RepoSibling:
+    lfs = data.get("lfs")
+    return RepoSibling(
+        rfilename=data["rfilename"],
+        size=data.get("size"),
+        blob_id=data.get("blob_id"),
+        lfs=BlobLfsInfo(**lfs) if lfs else None,
+    )
+
+class ModelMetadataCache:
+    """
+    On-disk cache of the HF hub metadata the offline evaluation needs.
+
+    What a commit holds (license, safetensors size, file list with hashes) never changes, so it is cached
+    forever under (repo, sha). Only the repo's latest sha can move; it is cached for `sha_ttl` seconds and
+    looked up for many repos at once with at most `max_concurrency` hub requests in flight.
+    `api` is anything with HfApi's model_info, so a local stand-in can replace the hub.
+    """
+
+    def __init__(self, root: str, api=None, sha_ttl: float = 300.0, max_concurrency: int = 8):
+        self.api = api or HfApi(token=os.getenv("HF_TOKEN", None))
+        self.sha_ttl = sha_ttl
+        self.max_concurrency = max_concurrency
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, METADATA_FILE_NAME)
+        self.lock = threading.Lock()
+        data = self._load()
+        self.shas: Dict[str, dict] = data.get("shas", {})
+        self.commits: Dict[str, dict] = data.get("commits", {})
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            bt.logging.warning(f"OFFLINE: Could not read the model metadata cache, starting empty: {e}")
+            return {}
+
+    def _save(self):
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"shas": self.shas, "commits": self.commits}, f)
+            os.replace(tmp_path, self.path)
+
+    def _store_commit(self, repo_id: str, info) -> dict:
+        safetensors = getattr(info, "safetensors", None)
+        metadata = {
+            "sha": info.sha,
+            # None when the repo has no model card data
+            "license": card_license(info),
+            # None when the hub has no safetensors metadata for the commit
+            "total_size": safetensors.total if safetensors else None,
+            "files": [sibling_to_dict(s) for s in info.siblings or []],
+        }
+        with self.lock:
+            self.commits[f"{repo_id}@{info.sha}"] = metadata
+        return metadata
+
+    def latest_sha(self, repo_id: str) -> str:
+        """Commit sha of the repo's main branch, from the cache while it is younger than the TTL."""
+        entry = self.shas.get(repo_id)
+        if entry and time.time() - entry["fetched_at"] < self.sha_ttl:
+            return entry["sha"]
+        info = self.api.model_info(repo_id, files_metadata=True)
+        with self.lock:
+            self.shas[repo_id] = {"sha": info.sha, "fetched_at": time.time()}
+        # the same response describes that commit, keep it
+        self._store_commit(repo_id, info)
+        self._save()
+        return info.sha
+
+    async def latest_shas(self, repo_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Latest sha of each repo, fetched concurrently, None for repos the hub can't resolve."""
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def lookup(repo_id):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.latest_sha, repo_id)
+                except Exception as e:
+                    bt.logging.debug(f"OFFLINE: Could not resolve {repo_id}: {e}")
+                    return None
+
+        unique = list(dict.fromkeys(repo_ids))
+        shas = await asyncio.gather(*(lookup(repo_id) for repo_id in unique))
+        return dict(zip(unique, shas))
+
+    def metadata(self, repo_id: str, sha: str) -> dict:
+        """License, safetensors size and files of repo_id@sha, fetched from the hub once."""
+        key = f"{repo_id}@{sha}"
+        if key not in self.commits:
+            self._store_commit(repo_id, self.api.model_info(repo_id, revision=sha, files_metadata=True))
+            self._save()
+        return self.commits[key]
+
+    def siblings(self, repo_id: str, sha: str) -> List[RepoSibling]:
+        return [sibling_from_dict(f) for f in self.metadata(repo_id, sha)["files"]]
@@ -0,0 +1,189 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import json
+import time
+import shutil
+import fnmatch
+import hashlib
+import bittensor as bt
+from huggingface_hub import HfApi, hf_hub_download
+
+# the files vLLM needs to load and serve a model, everything else in a repo is skipped
+INFERENCE_FILE_PATTERNS = [
+    "*.safetensors",
+    "*.safetensors.index.json",
+    "config.json",
+    "generation_config.json",
+    "tokenizer*",
+    "special_tokens_map.json",
+    "added_tokens.json",
+    "vocab*",
+    "merges.txt",
+    "*.model",
+    "chat_template*",
+    "preprocessor_config.json",
+]
+INDEX_FILE_NAME = "index.json"
+
+def is_inference_file(filename: str) -> bool:
+    return any(fnmatch.fnmatch(os.path.basename(filename), pattern) for pattern in INFERENCE_FILE_PATTERNS)
+
+def blob_key(sibling) -> str:
+    """Content address of a repo file: the LFS sha256 when there is one, otherwise the git blob id."""
+    if getattr(sibling, "lfs", None) is not None and getattr(sibling.lfs, "sha256", None):
+        return sibling.lfs.sha256
+    return f"git-{sibling.blob_id}"
+
+class ModelStore:
+    """
+    Local store of HF models for offline evaluation.
+
+    Only the files needed for inference are fetched. File contents live once under blobs/ keyed by their hash,
+    and each model@revision is a directory of hard links into them, so shards and tokenizers shared between
+    fine-tunes are downloaded once. Models are evicted least recently used first once the blobs exceed the disk budget.
+    """
+
+    def __init__(self, root: str, budget_bytes: int, api: HfApi = None, metadata_cache=None):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.api = api or HfApi()
+        # ModelMetadataCache, file listings of pinned commits then come from disk instead of the hub
+        self.metadata_cache = metadata_cache
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.models_dir = os.path.join(root, "models")
+        self.staging_dir = os.path.join(root, "staging")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.models_dir, exist_ok=True)
+        self.index_path = os.path.join(root, INDEX_FILE_NAME)
+        self.index = self._load_index()
+        self.listings = {}
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            bt.logging.warning(f"OFFLINE: Could not read model store index, starting empty: {e}")
+            return {}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def model_key(self, repo_id: str, revision: str) -> str:
+        return f"{repo_id}@{revision}"
+
+    def model_dir(self, repo_id: str, revision: str) -> str:
+        return os.path.join(self.models_dir, repo_id.replace("/", "--"), revision or "main")
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.blobs_dir, key)
+
+    def _link(self, blob_path: str, dest: str):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.lexists(dest):
+            os.remove(dest)
+        try:
+            os.link(blob_path, dest)
+        except OSError:
+            os.symlink(blob_path, dest)
+
+    def inference_files(self, repo_id: str, revision: str = None) -> list:
+        """The repo's inference files with their hub metadata (sizes and hashes), listed once per model@revision."""
+        key = self.model_key(repo_id, revision)
+        if key not in self.listings:
+            if self.metadata_cache is not None and revision:
+                siblings = self.metadata_cache.siblings(repo_id, revision)
+            else:
+                siblings = self.api.model_info(repo_id, revision=revision, files_metadata=True).siblings or []
+            self.listings[key] = [s for s in siblings if is_inference_file(s.rfilename)]
+        return self.listings[key]
+
+    def fingerprint(self, repo_id: str, revision: str = None) -> str:
+        """
+        Hash of the contents of the model's inference files, from the hub's per-file hashes without downloading.
+        File names don't count, so the same files re-uploaded under another repo or commit match.
+        """
+        blobs = sorted(blob_key(sibling) for sibling in self.inference_files(repo_id, revision))
+        if not blobs:
+            raise Exception(f"No inference files found in {self.model_key(repo_id, revision)}")
+        return hashlib.sha256("\n".join(blobs).encode("utf-8")).hexdigest()
+
+    def fetch(self, repo_id: str, revision: str = None) -> str:
+        """Local directory holding the inference files of repo_id@revision, downloading only blobs not already stored."""
+        key = self.model_key(repo_id, revision)
+        model_dir = self.model_dir(repo_id, revision)
+        entry = self.index.get(key)
+        if entry and os.path.isdir(model_dir):
+            bt.logging.info(f"OFFLINE: Model {key} already in the store")
+            entry["last_used"] = time.time()
+            self._save_index()
+            return model_dir
+
+        files = {}
+        sizes = {}
+        downloaded = 0
+        for sibling in self.inference_files(repo_id, revision):
+            blob = blob_key(sibling)
+            files[sibling.rfilename] = blob
+            sizes[blob] = sibling.size or 0
+            blob_path = self._blob_path(blob)
+            if not os.path.exists(blob_path):
+                staged = hf_hub_download(
+                    repo_id=repo_id, filename=sibling.rfilename, revision=revision, local_dir=self.staging_dir
+                )
+                os.replace(staged, blob_path)
+                downloaded += sizes[blob]
+            self._link(blob_path, os.path.join(model_dir, sibling.rfilename))
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+        if not files:
+            raise Exception(f"No inference files found in {key}")
+        bt.logging.info(f"OFFLINE: Stored {key}: {len(files)} files, {downloaded / 1e9:.2f} GB downloaded, rest shared")
+        self.index[key] = {"dir": model_dir, "files": files, "sizes": sizes, "last_used": time.time()}
+        self._save_index()
+        return model_dir
+
+    def total_bytes(self) -> int:
+        sizes = {}
+        for entry in self.index.values():
+            sizes.update(entry["sizes"])
+        return sum(sizes.values())
+
+    def evict(self, keep=()):
+        """Drops least recently used models (never those in `keep`) until the blobs fit the budget, then frees unreferenced blobs."""
+        keep = set(keep)
+        total = self.total_bytes()
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.budget_bytes:
+                break
+            if key in keep:
+                continue
+            bt.logging.info(f"OFFLINE: Evicting {key} from the model store")
+            shutil.rmtree(self.index.pop(key)["dir"], ignore_errors=True)
+            total = self.total_bytes()
+
+        referenced = {blob for entry in self.index.values() for blob in entry["files"].values()}
+        for blob in os.listdir(self.blobs_dir):
+            if blob not in referenced:
+                os.remove(self._blob_path(blob))
+        self._save_index()
@@ -1,35 +1,167 @@
 import os
 import sys
 import json
+import queue
 import traceback
 import re
 import shutil
+import threading
 import contextlib
+import importlib.util
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 from typing import Dict, Any, Optional, List, Union
 from pathlib import Path
+from bitagent.validator.bfcl_env import BFCL_PATCH_PATH
 
 
 # Context manager to redirect stdout/stderr temporarily
 class RedirectStdStreams:
+    """
+    sys.stdout/sys.stderr are process wide, so concurrent evaluations share one redirect: the first to enter
+    swaps the streams and the last to exit restores them.
+    """
+    _lock = threading.Lock()
+    _depth = 0
+    _saved = None
+
     def __init__(self, stdout=None, stderr=None):
-        self._stdout = stdout or open(os.devnull, 'w')
-        self._stderr = stderr or open(os.devnull, 'w')
-        self.old_stdout = sys.stdout
-        self.old_stderr = sys.stderr
+        self._stdout = stdout
+        self._stderr = stderr
 
     def __enter__(self):
-        sys.stdout = self._stdout
-        sys.stderr = self._stderr
+        with RedirectStdStreams._lock:
+            if RedirectStdStreams._depth == 0:
+                RedirectStdStreams._saved = (
+                    sys.stdout, sys.stderr,
+                    self._stdout or open(os.devnull, 'w'), self._stderr or open(os.devnull, 'w'),
+                )
+                sys.stdout, sys.stderr = RedirectStdStreams._saved[2:]
+            RedirectStdStreams._depth += 1
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        sys.stdout = self.old_stdout
-        sys.stderr = self.old_stderr
-        if self._stdout != sys.stdout:
-            self._stdout.close()
-        if self._stderr != sys.stderr:
-            self._stderr.close()
+        with RedirectStdStreams._lock:
+            RedirectStdStreams._depth -= 1
+            if RedirectStdStreams._depth == 0:
+                old_stdout, old_stderr, new_stdout, new_stderr = RedirectStdStreams._saved
+                sys.stdout, sys.stderr = old_stdout, old_stderr
+                for stream in (new_stdout, new_stderr):
+                    if stream not in (self._stdout, self._stderr):
+                        stream.close()
+                RedirectStdStreams._saved = None
+
+
+def _evaluation_worker(evaluator_args: Dict[str, Any], conn):
+    """
+    A long-lived (spawned) process of an EvaluationWorkerPool, running one evaluation at a time.
+    BFCL is imported and the BitAgent patch applied once, and the corpus cache and handlers are kept across
+    evaluations. Receives evaluation jobs over `conn` until None, answering each with ("ok", scores) or
+    ("error", traceback).
+    """
+    evaluator = None
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            if evaluator is None:
+                evaluator = BFCLEvaluator(**evaluator_args)
+                evaluator.apply_patch()
+            conn.send(("ok", evaluator._generate_and_score(**job)))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+
+
+class _EvaluationWorker:
+    def __init__(self, context, evaluator_args: Dict[str, Any]):
+        self.conn, worker_conn = context.Pipe()
+        self.process = context.Process(target=_evaluation_worker, args=(evaluator_args, worker_conn), daemon=True)
+        self.process.start()
+        worker_conn.close()
+
+    def run(self, job: Dict[str, Any]) -> tuple:
+        self.conn.send(job)
+        return self.conn.recv()
+
+    def close(self, timeout: float = 10.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class EvaluationWorkerPool:
+    """
+    Up to `size` long-lived spawned processes that generate and score BFCL evaluations, one at a time each.
+    BFCL's OSS handlers read the endpoint from VLLM_ENDPOINT/VLLM_PORT and its multi-turn execution keeps environment
+    instances in module globals keyed by model name and test id (every evaluation is "BitAgent"), so evaluations must
+    not share a process at the same time. Workers start on first use, and one that dies is replaced on the next job.
+    """
+
+    def __init__(self, size: int, evaluator_args: Dict[str, Any]):
+        self.context = multiprocessing.get_context("spawn")
+        self.evaluator_args = evaluator_args
+        self.idle = queue.Queue()
+        for _ in range(max(1, size)):
+            self.idle.put(None)
+
+    def run(self, job: Dict[str, Any]) -> tuple:
+        """("ok", scores) or ("error", message) for one evaluation, waiting for a free worker."""
+        worker = self.idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = _EvaluationWorker(self.context, self.evaluator_args)
+            try:
+                return worker.run(job)
+            except (EOFError, OSError):
+                worker.close(timeout=0)
+                exitcode = worker.process.exitcode
+                worker = None
+                return "error", f"BFCL evaluation worker exited with code {exitcode}"
+        finally:
+            self.idle.put(worker)
+
+    def close(self):
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.close()
+
+
+DECODE_FAILURE_MARKER = "Failed to decode"
+
+
+def _file_contains(path: str, needle: bytes, chunk_size: int = 1 << 20) -> bool:
+    """Substring scan of a file in fixed size chunks, without decoding or holding the whole file."""
+    overlap = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return False
+            if needle in overlap + chunk:
+                return True
+            overlap = chunk[-(len(needle) - 1):]
+
+
+# BFCL prompt and possible answer files by (version prefix, kind, category), loaded once per process and
+# shared by every evaluator. Evaluations run in long-lived worker processes, so each file is read once per worker
+# and shared by every model it scores. The runners only read these entries, so the same lists are handed to each evaluation.
+_CORPUS_CACHE: Dict[tuple, List[dict]] = {}
+_CORPUS_INDEX: Dict[tuple, Dict[str, dict]] = {}
 
 
 class BFCLEvaluator:
@@ -43,7 +175,10 @@ class BFCLEvaluator:
     def __init__(self, 
                  bfcl_path: Optional[str] = None, 
                  verbose: bool = False,
-                 project_root: Optional[str] = None):
+                 project_root: Optional[str] = None,
+                 num_threads: int = 1,
+                 max_concurrent_evaluations: int = 4,
+                 patch_path: Optional[str] = BFCL_PATCH_PATH):
         """
         Initialize the minimal BFCL evaluator.
         
@@ -51,8 +186,18 @@ class BFCLEvaluator:
             bfcl_path: Optional path to the BFCL module directory
             verbose: Whether to print verbose output and allow BFCL logs
             project_root: Root directory of the BFCL project (default: auto-detect)
+            num_threads: Concurrent requests BFCL generation sends to a model endpoint
+            max_concurrent_evaluations: Evaluations run at once, each worker process runs one at a time
+            patch_path: BitAgent BFCL patch the worker processes apply once (see apply_patch)
         """
         self.verbose = verbose
+        self.bfcl_path = bfcl_path
+        self.num_threads = num_threads
+        self.max_concurrent_evaluations = max_concurrent_evaluations
+        self.patch_path = os.path.abspath(patch_path) if patch_path else None
+        self.handlers = {}
+        self.worker_pool = None
+        self.worker_pool_lock = threading.Lock()
         
         if bfcl_path and bfcl_path not in sys.path:
             sys.path.append(bfcl_path)
@@ -103,6 +248,72 @@ class BFCLEvaluator:
             print(f"[WARNING] Make sure BFCL is installed or the path is correct")
             raise ImportError(f"Required BFCL modules not found: {str(e)}")
     
+    def _load_corpus(self, kind: str, test_category: str) -> List[dict]:
+        """Prompt ("prompt") or possible answer ("possible_answer") entries of a category, sorted by id."""
+        key = (self.VERSION_PREFIX, kind, test_category)
+        if key not in _CORPUS_CACHE:
+            root = self.PROMPT_PATH if kind == "prompt" else self.POSSIBLE_ANSWER_PATH
+            with self._silence_output():
+                entries = self.load_file(self.find_file_with_suffix(root, test_category), sort_by_id=True)
+            _CORPUS_CACHE[key] = entries
+            _CORPUS_INDEX[key] = {entry["id"]: entry for entry in entries}
+        return _CORPUS_CACHE[key]
+
+    def prompts(self, test_category: str) -> List[dict]:
+        return self._load_corpus("prompt", test_category)
+
+    def possible_answers(self, test_category: str) -> List[dict]:
+        return self._load_corpus("possible_answer", test_category)
+
+    def corpus_entry(self, kind: str, test_category: str, test_id: str) -> Optional[dict]:
+        """A single prompt or possible answer by test case id."""
+        self._load_corpus(kind, test_category)
+        return _CORPUS_INDEX[(self.VERSION_PREFIX, kind, test_category)].get(test_id)
+
+    def handler(self, model_name: str):
+        """BFCL model handler, created once per model name."""
+        if model_name not in self.handlers:
+            with self._silence_output():
+                self.handlers[model_name] = self.get_handler(model_name)
+        return self.handlers[model_name]
+
+    def apply_patch(self):
+        """Applies the BitAgent BFCL patch (third_party/patches/bfcl_patch.py) in this process."""
+        if not self.patch_path or not os.path.exists(self.patch_path):
+            self.log(f"BFCL patch not found at {self.patch_path}, using BFCL as installed", "WARNING")
+            return
+        spec = importlib.util.spec_from_file_location("bfcl_patch", self.patch_path)
+        bfcl_patch = importlib.util.module_from_spec(spec)
+        with self._silence_output():
+            spec.loader.exec_module(bfcl_patch)
+            bfcl_patch.apply_bfcl_patch(verbose=self.verbose)
+
+    @staticmethod
+    def _clear_multi_turn_instances():
+        """Drops the environment instances BFCL's multi-turn execution keeps in module globals."""
+        try:
+            from bfcl.eval_checker.multi_turn_eval import multi_turn_utils
+        except ImportError:
+            return
+        for name in [name for name in vars(multi_turn_utils) if name.endswith("_instance")]:
+            delattr(multi_turn_utils, name)
+
+    def _worker_pool(self) -> EvaluationWorkerPool:
+        with self.worker_pool_lock:
+            if self.worker_pool is None:
+                self.worker_pool = EvaluationWorkerPool(self.max_concurrent_evaluations, dict(
+                    bfcl_path=self.bfcl_path, verbose=self.verbose, project_root=self.PROJECT_ROOT,
+                    num_threads=self.num_threads, patch_path=self.patch_path,
+                ))
+            return self.worker_pool
+
+    def close(self):
+        """Stops the evaluation worker processes."""
+        with self.worker_pool_lock:
+            if self.worker_pool is not None:
+                self.worker_pool.close()
+                self.worker_pool = None
+
     def _silence_output(self):
         """
         Context manager to silence stdout/stderr.
@@ -143,7 +354,9 @@ class BFCLEvaluator:
         test_categories: List[str] = ["multi_turn_base"],
         temperature: float = 0.001,
         backend: str = "sglang",
-        cleanup_files: bool = True
+        cleanup_files: bool = True,
+        num_threads: Optional[int] = None,
+        run_name: Optional[str] = None
     ) -> Dict[str, Any]:
         
         """
@@ -157,143 +370,58 @@ class BFCLEvaluator:
             temperature: Temperature parameter for the model
             backend: Backend used (vllm or sglang)
             cleanup_files: Whether to clean up files after evaluation
+            num_threads: Concurrent generation requests to the endpoint (default: the evaluator's num_threads)
+            run_name: Subdirectory for this evaluation's result and score files, needed for concurrent evaluations
             
         Returns:
             Dictionary containing evaluation results and scores
         """
         try:
-            # Set environment variables for the server
-            os.environ["VLLM_ENDPOINT"] = endpoint
-            os.environ["VLLM_PORT"] = str(port)
-            
-            # Import the generation function
-            with self._silence_output():
-                from bfcl._llm_response_generation import main as generation_main
+            # Path like the BFCL defaults, the runners join onto score_dir with /
+            result_dir = Path(self.result_dir) / run_name if run_name else Path(self.result_dir)
+            score_dir = Path(self.score_dir) / run_name if run_name else Path(self.score_dir)
             
             # Create directories if they don't exist
-            os.makedirs(self.result_dir, exist_ok=True)
-            os.makedirs(self.score_dir, exist_ok=True)
+            os.makedirs(result_dir, exist_ok=True)
+            os.makedirs(score_dir, exist_ok=True)
             
             # Create a standard path for model results
             model_dir_name = model_name.replace("/", "_")
-            model_result_dir = os.path.join(self.result_dir, model_dir_name)
-            model_score_dir = os.path.join(self.score_dir, model_dir_name)
+            model_result_dir = os.path.join(result_dir, model_dir_name)
+            model_score_dir = os.path.join(score_dir, model_dir_name)
             
             os.makedirs(model_result_dir, exist_ok=True)
             os.makedirs(model_score_dir, exist_ok=True)
             
             # Create arguments for generation
-            gen_args = SimpleNamespace(
+            gen_args = dict(
                 model=[model_name],
                 test_category=test_categories,
                 temperature=temperature,
                 include_input_log=False,
                 exclude_state_log=False,
                 num_gpus=1,
-                num_threads=1,
+                num_threads=num_threads or self.num_threads,
                 gpu_memory_utilization=0.9,
                 backend=backend,
                 skip_server_setup=True,
                 local_model_path=None,
-                result_dir=str(self.result_dir),
+                result_dir=str(result_dir),
                 allow_overwrite=True,
                 run_ids=False
             )
             
-            # Run generation to create model responses
-            with self._silence_output():
-                generation_main(gen_args)
-            
-            # Process each category and combine results
-            total_correct = 0
-            total_count = 0
-            
-            for test_category in test_categories:
-                # Verify result file exists
-                result_file = os.path.join(model_result_dir, f"{self.VERSION_PREFIX}_{test_category}_result.json")
-                if not os.path.exists(result_file):
-                    continue
-                    
-                # Fix any decoding issues in the result file
-                with self._silence_output():
-                    self._fix_decode_errors(result_file, test_category)
-                
-                # Load files and get handler with silenced output
-                with self._silence_output():
-                    model_result = self.load_file(result_file, sort_by_id=True)
-                    handler = self.get_handler(model_name)
-                    
-                    # Load prompt for all categories
-                    prompt_file = self.find_file_with_suffix(self.PROMPT_PATH, test_category)
-                    prompt = self.load_file(prompt_file, sort_by_id=True)
-                
-                # Run the evaluation with silenced output - use appropriate runner
-                with self._silence_output():
-                    if self.is_multi_turn(test_category):
-                        # Load possible answer for multi-turn
-                        possible_answer_file = self.find_file_with_suffix(self.POSSIBLE_ANSWER_PATH, test_category)
-                        possible_answer = self.load_file(possible_answer_file, sort_by_id=True)
-                        
-                        # Use multi-turn runner
-                        accuracy, count = self.multi_turn_runner(
-                            handler,
-                            model_result,
-                            prompt,
-                            possible_answer,
-                            model_dir_name,
-                            test_category,
-                            self.score_dir
-                        )
-                    elif "irrelevance" in test_category or "relevance" in test_category:
-                        # Import and use relevance runner
-                        from bfcl.eval_checker.eval_runner import relevance_file_runner
-                        accuracy, count = relevance_file_runner(
-                            handler, model_result, prompt, model_dir_name, test_category, self.score_dir
-                        )
-                    else:
-                        # Single-turn AST evaluation
-                        from bfcl.eval_checker.eval_runner import ast_file_runner
-                        
-                        # Load possible answer for single-turn
-                        possible_answer_file = self.find_file_with_suffix(self.POSSIBLE_ANSWER_PATH, test_category)
-                        possible_answer = self.load_file(possible_answer_file, sort_by_id=True)
-                        
-                        # Determine language
-                        language = "Python"
-                        if "java" in test_category.lower():
-                            language = "Java"
-                        elif "javascript" in test_category.lower():
-                            language = "JavaScript"
-                        
-                        accuracy, count = ast_file_runner(
-                            handler,
-                            model_result,
-                            prompt,
-                            possible_answer,
-                            language,
-                            test_category,
-                            model_dir_name,
-                            self.score_dir,
-                        )
-                
-                # Accumulate results
-                total_correct += int(accuracy * count)
-                total_count += count
-            
-            # Calculate overall accuracy
-            overall_accuracy = total_correct / total_count if total_count > 0 else 0.0
-            
-            # Create result dictionary
-            result = {
-                "overall_score": overall_accuracy,
-                "total_count": total_count,
-                "correct_count": total_correct
-            }
+            # Generate and score in a worker process, against this evaluation's endpoint
+            env = {"VLLM_ENDPOINT": endpoint, "VLLM_PORT": str(port)}
+            score_args = dict(model_name=model_name, test_categories=test_categories, result_dir=result_dir, score_dir=score_dir)
+            status, result = self._worker_pool().run(dict(gen_args=gen_args, env=env, score_args=score_args))
+            if status != "ok":
+                raise RuntimeError(result)
             
             # Clean up if requested
             if cleanup_files:
                 with self._silence_output():
-                    self._clean_model_directories(model_dir_name)
+                    self._clean_model_directories(model_dir_name, result_dir, score_dir)
             
             return result
             
@@ -305,9 +433,150 @@ class BFCLEvaluator:
                 "overall_score": 0.0
             }
     
+    def _generate_and_score(self, gen_args: Dict[str, Any], env: Dict[str, str], score_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        BFCL generation and scoring of one evaluation, in a worker process (see `_evaluation_worker`).
+        The endpoint variables are set and the multi-turn instances of the previous evaluation dropped first.
+        """
+        os.environ.update(env)
+        self._clear_multi_turn_instances()
+        with self._silence_output():
+            from bfcl._llm_response_generation import main as generation_main
+            generation_main(SimpleNamespace(**gen_args))
+        return self._score_results(**score_args)
+
+    def _score_results(self, model_name: str, test_categories: List[str], result_dir: Path, score_dir: Path) -> Dict[str, Any]:
+        """Score generated results with BFCL's runners, the prompts and possible answers from the corpus cache."""
+        model_dir_name = model_name.replace("/", "_")
+        model_result_dir = os.path.join(result_dir, model_dir_name)
+
+        # Process each category and combine results
+        total_correct = 0
+        total_count = 0
+        handler = self.handler(model_name)
+        
+        for test_category in test_categories:
+            # Verify result file exists
+            result_file = os.path.join(model_result_dir, f"{self.VERSION_PREFIX}_{test_category}_result.json")
+            if not os.path.exists(result_file):
+                continue
+                
+            # Fix any decoding issues in the result file
+            with self._silence_output():
+                self._fix_decode_errors(result_file, test_category)
+            
+            # Load the model's results, the prompts come from the corpus cache
+            with self._silence_output():
+                model_result = self.load_file(result_file, sort_by_id=True)
+            prompt = self.prompts(test_category)
+            
+            # Run the evaluation with silenced output - use appropriate runner
+            with self._silence_output():
+                if self.is_multi_turn(test_category):
+                    possible_answer = self.possible_answers(test_category)
+                    
+                    # Use multi-turn runner
+                    accuracy, count = self.multi_turn_runner(
+                        handler,
+                        model_result,
+                        prompt,
+                        possible_answer,
+                        model_dir_name,
+                        test_category,
+                        score_dir
+                    )
+                elif "irrelevance" in test_category or "relevance" in test_category:
+                    # Import and use relevance runner
+                    from bfcl.eval_checker.eval_runner import relevance_file_runner
+                    accuracy, count = relevance_file_runner(
+                        handler, model_result, prompt, model_dir_name, test_category, score_dir
+                    )
+                else:
+                    # Single-turn AST evaluation
+                    from bfcl.eval_checker.eval_runner import ast_file_runner
+                    
+                    possible_answer = self.possible_answers(test_category)
+                    
+                    # Determine language
+                    language = "Python"
+                    if "java" in test_category.lower():
+                        language = "Java"
+                    elif "javascript" in test_category.lower():
+                        language = "JavaScript"
+                    
+                    accuracy, count = ast_file_runner(
+                        handler,
+                        model_result,
+                        prompt,
+                        possible_answer,
+                        language,
+                        test_category,
+                        model_dir_name,
+                        score_dir,
+                    )
+            
+            # Accumulate results
+            total_correct += int(accuracy * count)
+            total_count += count
+        
+        # Calculate overall accuracy
+        overall_accuracy = total_correct / total_count if total_count > 0 else 0.0
+        
+        return {
+            "overall_score": overall_accuracy,
+            "total_count": total_count,
+            "correct_count": total_correct
+        }
+    
+    def evaluate_models(self, evaluations: List[Dict[str, Any]], max_concurrent: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate several served models at once, each generated and scored in one of the evaluator's worker processes.
+        
+        Args:
+            evaluations: evaluate_model keyword arguments per model, each with its own endpoint/port
+            max_concurrent: Evaluations running at once (default: the evaluator's max_concurrent_evaluations)
+            
+        Returns:
+            The evaluate_model results, in the order of `evaluations`
+        """
+        evaluations = [
+            {**kwargs, "run_name": kwargs.get("run_name") or f"{kwargs.get('endpoint', 'localhost')}_{kwargs.get('port', 51001)}"}
+            for kwargs in evaluations
+        ]
+        with ThreadPoolExecutor(max_workers=max_concurrent or self.max_concurrent_evaluations) as pool:
+            return list(pool.map(lambda kwargs: self.evaluate_model(**kwargs), evaluations))
+    
+    @staticmethod
+    def _placeholder_call(failed_response: str) -> str:
+        """A minimal valid function call, using the function name of the failed response when there is one."""
+        function_match = re.search(r'\[(\w+)\(.*?\)\]', failed_response)
+        function_name = function_match.group(1) if function_match else "function_name"
+        return f"[{function_name}(param=\"value\")]"
+
+    def _fix_entry(self, data: dict, test_category: str) -> dict:
+        """Replaces the "Failed to decode" responses of one result entry."""
+        # === For multi-turn tests ===
+        if self.is_multi_turn(test_category):
+            if "result" in data and isinstance(data["result"], list):
+                # This is the format for multi-turn data: list of turns, each with a list of steps
+                for turn_data in data["result"]:
+                    if isinstance(turn_data, list):
+                        for j, step_response in enumerate(turn_data):
+                            if isinstance(step_response, str) and DECODE_FAILURE_MARKER in step_response:
+                                turn_data[j] = self._placeholder_call(step_response)
+
+        # === For single-turn tests ===
+        elif "result" in data and isinstance(data["result"], str):
+            if DECODE_FAILURE_MARKER in data["result"]:
+                data["result"] = self._placeholder_call(data["result"])
+        return data
+
     def _fix_decode_errors(self, result_file: str, test_category: str) -> None:
         """
         Fix common decode errors in the result file.
+
+        The file is streamed line by line and only lines mentioning a decode failure are parsed and rewritten,
+        through a temp file swapped in place. Files without any failure are left untouched.
         
         Args:
             result_file: Path to the result file
@@ -317,62 +586,29 @@ class BFCLEvaluator:
             if not os.path.exists(result_file):
                 self.log(f"Cannot fix decode errors: File not found - {result_file}", "WARNING")
                 return
-                
-            with open(result_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            fixed_lines = []
-            for line in lines:
-                try:
-                    data = json.loads(line.strip())
-                    
-                    # === For multi-turn tests ===
-                    if self.is_multi_turn(test_category):
-                        if "result" in data and isinstance(data["result"], list):
-                            # This is the format for multi-turn data: list of turns, each with a list of steps
-                            for i, turn_data in enumerate(data["result"]):
-                                if isinstance(turn_data, list):
-                                    for j, step_response in enumerate(turn_data):
-                                        if isinstance(step_response, str) and "Failed to decode" in step_response:
-                                            # Replace with a minimal valid function call for multi-turn
-                                            function_match = re.search(r'\[(\w+)\(.*?\)\]', step_response)
-                                            if function_match:
-                                                # Use the actual function name if we can extract it
-                                                function_name = function_match.group(1)
-                                                data["result"][i][j] = f"[{function_name}(param=\"value\")]"
-                                            else:
-                                                data["result"][i][j] = "[function_name(param=\"value\")]"
-                    
-                    # === For single-turn tests ===
-                    elif "result" in data and isinstance(data["result"], str):
-                        if "Failed to decode" in data["result"]:
-                            # Try to find function call patterns in the failed response
-                            function_match = re.search(r'\[(\w+)\(.*?\)\]', data["result"])
-                            if function_match:
-                                # Use the actual function name if we can extract it
-                                function_name = function_match.group(1)
-                                data["result"] = f"[{function_name}(param=\"value\")]"
-                            else:
-                                # Default valid function call
-                                data["result"] = "[function_name(param=\"value\")]"
-                    
-                    fixed_lines.append(json.dumps(data) + "\n")
-                    
-                except json.JSONDecodeError:
-                    # Keep original line if we can't parse it
-                    fixed_lines.append(line)
-            
-            # Write fixed content back to file
-            with open(result_file, 'w', encoding='utf-8') as f:
-                f.writelines(fixed_lines)
+
+            if not _file_contains(result_file, DECODE_FAILURE_MARKER.encode("utf-8")):
+                return
+
+            tmp_file = f"{result_file}.tmp"
+            with open(result_file, 'r', encoding='utf-8') as src, open(tmp_file, 'w', encoding='utf-8') as dst:
+                for line in src:
+                    if DECODE_FAILURE_MARKER in line:
+                        try:
+                            line = json.dumps(self._fix_entry(json.loads(line), test_category)) + "\n"
+                        except json.JSONDecodeError:
+                            # Keep original line if we can't parse it
+                            pass
+                    dst.write(line)
+            os.replace(tmp_file, result_file)
                 
         except Exception as e:
             self.log(f"Error fixing decode errors: {str(e)}", "WARNING")
     
-    def _clean_model_directories(self, model_name: str):
+    def _clean_model_directories(self, model_name: str, result_dir: Optional[str] = None, score_dir: Optional[str] = None):
         """Clean up model-specific directories."""
-        model_result_dir = os.path.join(self.result_dir, model_name)
-        model_score_dir = os.path.join(self.score_dir, model_name)
+        model_result_dir = os.path.join(result_dir or self.result_dir, model_name)
+        model_score_dir = os.path.join(score_dir or self.score_dir, model_name)
         
         if os.path.exists(model_result_dir):
             shutil.rmtree(model_result_dir)
@@ -6,12 +6,36 @@ import subprocess
 import time
 import csv
 import bittensor as bt
-from common.utils.shell import execute_shell_command
-from huggingface_hub import model_info, snapshot_download
+from common.utils.shell import run_shell_command, start_shell_command
 from bitagent.protocol import GetHFModelName
+from bitagent.validator.model_store import ModelStore
+from bitagent.validator.model_metadata import ModelMetadataCache
+from bitagent.validator.smoke_test import (
+    SMOKE_TEST_CATEGORIES,
+    score_smoke_test,
+    smoke_test_case_ids,
+    wait_for_server,
+)
+from bitagent.validator.adaptive_eval import (
+    AccuracyEstimate,
+    StratifiedSampler,
+    bfcl_overall_weights,
+    decision_boundary,
+    find_bfcl_data_dir,
+    load_bfcl_case_ids,
+    read_bfcl_category_counts,
+    should_stop,
+)
 from typing import Dict, List, Optional
 
+# BFCL's OSS handlers launch vLLM with this dtype and --trust-remote-code, the served model matches that launch
+VLLM_DTYPE = "bfloat16"
 
+BFCL_TEST_CATEGORIES = [
+    "simple", "parallel", "multiple", "parallel_multiple", "java", "javascript", "irrelevance",
+    "live_simple", "live_multiple", "live_parallel", "live_parallel_multiple", "live_irrelevance", "live_relevance",
+    "multi_turn_base", "multi_turn_miss_func", "multi_turn_miss_param",
+]
 
 
 def parse_percentage(value: Optional[str]) -> Optional[float]:
@@ -23,6 +47,131 @@ def parse_percentage(value: Optional[str]) -> Optional[float]:
     except:
         return None
 
+def get_model_metadata_cache(self) -> ModelMetadataCache:
+    if getattr(self, "model_metadata_cache", None) is None:
+        cache_dir = os.path.expanduser(self.config.validator_hf_cache_dir)
+        self.model_metadata_cache = ModelMetadataCache(
+            os.path.join(cache_dir, "bitagent_model_store"),
+            sha_ttl=self.config.validator_hf_metadata_ttl,
+            max_concurrency=self.config.validator_hf_metadata_concurrency,
+        )
+    return self.model_metadata_cache
+
+def get_model_store(self) -> ModelStore:
+    if getattr(self, "model_store", None) is None:
+        cache_dir = os.path.expanduser(self.config.validator_hf_cache_dir)
+        self.model_store = ModelStore(
+            os.path.join(cache_dir, "bitagent_model_store"),
+            int(self.config.validator_model_store_budget_gb * 1e9),
+            metadata_cache=get_model_metadata_cache(self),
+        )
+    return self.model_store
+
+def get_fingerprint_scores(self) -> Dict[str, float]:
+    """BFCL scores of the current competition by model fingerprint (ModelStore.fingerprint)."""
+    if getattr(self, "fingerprint_scores", None) is None:
+        self.fingerprint_scores = {}
+    return self.fingerprint_scores.setdefault(self.competition_version, {})
+
+def get_smoke_test_failures(self) -> Dict[str, str]:
+    """Smoke test failure reasons of the current competition by model fingerprint."""
+    if getattr(self, "smoke_test_failures", None) is None:
+        self.smoke_test_failures = {}
+    return self.smoke_test_failures.setdefault(self.competition_version, {})
+
+def get_bfcl_data_dir(self, venv_path) -> str:
+    bfcl_env = getattr(self, "bfcl_env", None)
+    data_dir = bfcl_env["data_dir"] if bfcl_env else find_bfcl_data_dir(venv_path)
+    if data_dir is None:
+        raise Exception("BFCL data directory not found")
+    return data_dir
+
+async def run_bfcl_cases(self, venv_path, base_model_name, model_path, server_port, result_dir, score_dir, data_dir, case_ids):
+    """BFCL generate (against the running model server) and evaluate on just `case_ids`, a list of test ids by category."""
+    # BFCL reads the ids for --run-ids from its project root
+    ids_path = os.path.join(os.path.dirname(os.path.dirname(data_dir)), "test_case_ids_to_generate.json")
+    with open(ids_path, "w") as f:
+        json.dump(case_ids, f)
+    categories = ",".join(case_ids)
+
+    generate_cmd = f"""
+/bin/bash -c "
+export PATH={venv_path}/bin:$PATH && \
+export PYTHONPATH={venv_path}/lib/python*/site-packages:$PYTHONPATH && \
+export VIRTUAL_ENV={venv_path} && \
+export VLLM_ENDPOINT=localhost && \
+export VLLM_PORT={server_port} && \
+{venv_path}/bin/python -m bfcl generate \
+--model {base_model_name} \
+--test-category {categories} \
+--backend vllm \
+--skip-server-setup \
+--run-ids \
+--local-model-path {model_path} \
+--result-dir {result_dir}
+"
+"""
+    bt.logging.debug(f"OFFLINE: Running BFCL Generate on {sum(len(ids) for ids in case_ids.values())} selected cases...")
+    process = await run_shell_command(generate_cmd, model_path, timeout=self.config.validator_bfcl_command_timeout)
+    returncode = process.returncode
+    if returncode != 0:
+        bt.logging.error(f"OFFLINE: Generate failed with return code: {returncode}, last output: {process.tail(5)}")
+        raise Exception("Generate failed")
+
+    evaluate_cmd = f"""
+{venv_path}/bin/python -m bfcl evaluate \
+--model {base_model_name} \
+--test-category {categories} \
+--partial-eval \
+--result-dir {result_dir} \
+--score-dir {score_dir}
+"""
+    bt.logging.debug(f"OFFLINE: Running BFCL Evaluate on the selected cases...")
+    process = await run_shell_command(evaluate_cmd, model_path, timeout=self.config.validator_bfcl_command_timeout)
+    returncode = process.returncode
+    if returncode != 0:
+        bt.logging.error(f"OFFLINE: Evaluate failed with return code: {returncode}, last output: {process.tail(5)}")
+        raise Exception("Evaluate failed")
+
+async def run_adaptive_bfcl(self, venv_path, base_model_name, model_path, server_port, result_dir, score_dir, boundary) -> Dict:
+    """
+    BFCL on stratified batches of test cases against the running model server, stopping as soon as the
+    confidence interval of the overall accuracy is clearly below (or, unless finalists get a full run, above)
+    `boundary`. Without a boundary every case is run, batch by batch.
+    """
+    data_dir = get_bfcl_data_dir(self, venv_path)
+    case_ids = load_bfcl_case_ids(data_dir, BFCL_TEST_CATEGORIES)
+    sampler = StratifiedSampler(case_ids)
+    category_sizes = {c: len(ids) for c, ids in case_ids.items()}
+    # weighted like BFCL's overall accuracy so adaptive and full-run scores compare, multi_turn_long_context
+    # isn't run by either and counts as 0 in both
+    estimate = AccuracyEstimate(category_sizes, z=self.config.validator_adaptive_z, weights=bfcl_overall_weights(category_sizes))
+    model_dir_name = base_model_name.replace("/", "_")
+    sampled = {}
+
+    while sampler.remaining() > 0:
+        for category, ids in sampler.next_batch(self.config.validator_adaptive_batch_size).items():
+            sampled.setdefault(category, []).extend(ids)
+        await run_bfcl_cases(self, venv_path, base_model_name, model_path, server_port, result_dir, score_dir, data_dir, sampled)
+
+        for category in sampled:
+            counts = read_bfcl_category_counts(score_dir, model_dir_name, category)
+            if counts is not None:
+                estimate.update(category, *counts)
+
+        low, high = estimate.interval()
+        bt.logging.info(f"OFFLINE: Adaptive estimate {estimate.mean():.4f} [{low:.4f}, {high:.4f}], boundary {boundary}, {sampler.remaining()} cases left")
+        if should_stop((low, high), boundary, self.config.validator_adaptive_full_run_finalists):
+            break
+
+    return {
+        'overall_score': estimate.mean(),
+        'categories': {
+            category: correct / evaluated if evaluated else None
+            for category, (correct, evaluated) in estimate.counts.items()
+        },
+    }
+
 async def offline_task(self, wandb_data):
     """Evaluate models using BFCL."""
     bt.logging.debug("OFFLINE: Starting offline task")
@@ -51,18 +200,21 @@ async def offline_task(self, wandb_data):
         wandb_data['event_name'] = "GetHFModelName Responses Fetched"
         self.log_event(wandb_data)
         
+        hf_model_names = {}
         for i, uid in enumerate(miners_needing_lookup):
             try:
-                hf_model_name = responses[i].hf_model_name or ""
+                hf_model_names[uid] = responses[i].hf_model_name or ""
             except:
-                hf_model_name = ""
-            
+                hf_model_names[uid] = ""
+        
+        # latest commit of every submitted repo, concurrently and from the cache when recently looked up
+        latest_shas = await get_model_metadata_cache(self).latest_shas(
+            [name for name in hf_model_names.values() if "/" in name]
+        )
+        for uid, hf_model_name in hf_model_names.items():
             if "/" in hf_model_name:
-                try:
-                    info = model_info(hf_model_name)
-                    self.offline_model_names[self.competition_version][uid] = f"{hf_model_name}@{info.sha}"
-                except:
-                    self.offline_model_names[self.competition_version][uid] = ""
+                sha = latest_shas.get(hf_model_name)
+                self.offline_model_names[self.competition_version][uid] = f"{hf_model_name}@{sha}" if sha else ""
     
     # Group miners by model
     model_to_uids = {}
@@ -107,9 +259,13 @@ async def offline_task(self, wandb_data):
         
         try:
             # Check model metadata
-            info = model_info(model_name)
-            total_size = info.safetensors.total if hasattr(info, 'safetensors') else 0
-            license_info = info.card_data.get('license', 'Unknown') if hasattr(info, 'card_data') else 'Unknown'
+            metadata = await asyncio.to_thread(get_model_metadata_cache(self).metadata, model_name, commit_hash)
+            total_size = metadata["total_size"]
+            license_info = metadata["license"]
+            if total_size is None:
+                raise Exception(f"No safetensors metadata for {model_full}")
+            if license_info is None:
+                raise Exception(f"No model card data for {model_full}")
             
             # Skip if wrong license or too big
             if license_info not in ["apache-2.0", "cc-by-nc-4.0", "mit"] or total_size > 10_000_000_000:
@@ -122,18 +278,43 @@ async def offline_task(self, wandb_data):
                 wandb_data.pop('miner_uids')
                 continue
             
+            # Reuse the score of a model with identical files (same weights under another name or commit)
+            model_store = get_model_store(self)
+            fingerprint = await asyncio.to_thread(model_store.fingerprint, model_name, commit_hash)
+            fingerprint_scores = get_fingerprint_scores(self)
+            smoke_test_failures = get_smoke_test_failures(self)
+            if fingerprint in smoke_test_failures:
+                bt.logging.info(f"OFFLINE: Model {i+1} already failed the smoke test: {smoke_test_failures[fingerprint]}")
+                for uid in model_to_uids[model_full]:
+                    self.offline_scores[self.competition_version][uid] = 0.0
+                wandb_data['event_name'] = "Skipping Model That Failed Smoke Test"
+                wandb_data['error'] = smoke_test_failures[fingerprint]
+                wandb_data['miner_uids'] = model_to_uids[model_full]
+                self.log_event(wandb_data)
+                wandb_data.pop('error', None)
+                wandb_data.pop('miner_uids', None)
+                continue
+            if fingerprint in fingerprint_scores:
+                overall_score = fingerprint_scores[fingerprint]
+                bt.logging.info(f"OFFLINE: Model {i+1} has the same files as an already scored model, reusing score {overall_score:.4f}")
+                for uid in model_to_uids[model_full]:
+                    self.offline_scores[self.competition_version][uid] = overall_score
+                self.update_offline_scores([overall_score] * len(model_to_uids[model_full]), model_to_uids[model_full])
+                wandb_data['event_name'] = "Reusing Score For Duplicate Model"
+                wandb_data['BFCL_score'] = overall_score
+                wandb_data['miner_uids'] = model_to_uids[model_full]
+                self.log_event(wandb_data)
+                wandb_data.pop('BFCL_score', None)
+                wandb_data.pop('miner_uids', None)
+                continue
+            
             bt.logging.info(f"OFFLINE: Evaluating model {i+1} of {len(unique_miner_hf_model_names)}")
             wandb_data['event_name'] = "HF Model Eval Starting"
             self.log_event(wandb_data)
             
-            # 1. Download the model
-            cache_dir = os.path.expanduser(self.config.validator_hf_cache_dir)
-            bt.logging.info(f"OFFLINE: Downloading model to {cache_dir}")
-            model_path = snapshot_download(
-                repo_id=model_name,
-                revision=commit_hash,
-                cache_dir=cache_dir
-            )
+            # 1. Download the model (inference files only, blobs shared with models already in the store)
+            bt.logging.info(f"OFFLINE: Downloading model to {model_store.root}")
+            model_path = await asyncio.to_thread(model_store.fetch, model_name, commit_hash)
             bt.logging.info(f"OFFLINE: Download complete")
             
             # 2. Use a supported Salesforce model name
@@ -148,104 +329,136 @@ async def offline_task(self, wandb_data):
             os.makedirs(score_dir, exist_ok=True)
             
             venv_path = f"{os.getcwd()}/.venvbfcl"
-            # Test the full environment
-            test_cmd = f"""
-/bin/bash -c '
-export PATH={venv_path}/bin:$PATH && \
-export PYTHONPATH={venv_path}/lib/python*/site-packages:$PYTHONPATH && \
-export VIRTUAL_ENV={venv_path} && \
-{venv_path}/bin/python -c "import bfcl; print('"'"'BFCL imported successfully'"'"')"
-'
+
+            # 4. Serve the model once - a quick smoke test gates the full BFCL run, which then reuses the server
+            server_port = self.config.validator_hf_server_port
+            server_url = f"http://localhost:{server_port}/v1"
+            serve_cmd = f"""
+{venv_path}/bin/python -m vllm.entrypoints.openai.api_server \
+--model {model_path} \
+--port {server_port} \
+--dtype {VLLM_DTYPE} \
+--trust-remote-code \
+--gpu-memory-utilization {self.config.validator_hf_server_mem_fraction_static}
 """
-            test_process = await asyncio.to_thread(execute_shell_command, test_cmd, model_path)
-            test_returncode = await asyncio.to_thread(test_process.wait)
-            bt.logging.info(f"BFCL import test returned: {test_returncode}")
+            scores_data = {}
+            bt.logging.debug(f"OFFLINE: Starting model server...")
+            server_process = await start_shell_command(serve_cmd, model_path)
+            try:
+                # not cached against the model, the server may fail for reasons on the validator's side
+                if not await wait_for_server(server_url, server_process):
+                    raise Exception(f"Model server failed to start: {server_process.tail(5)}")
+
+                # a few BFCL cases through the handler the full run uses; command or scoring errors raise before
+                # anything is cached, only a model that was scored below the floor is remembered
+                data_dir = get_bfcl_data_dir(self, venv_path)
+                smoke_case_ids = smoke_test_case_ids(load_bfcl_case_ids(data_dir, SMOKE_TEST_CATEGORIES))
+                await run_bfcl_cases(self, venv_path, base_model_name, model_path, server_port, result_dir, score_dir,
+                                     data_dir, smoke_case_ids)
+                probe_scores = score_smoke_test(score_dir, base_model_name.replace("/", "_"), smoke_case_ids)
+                bt.logging.info(f"OFFLINE: Smoke test parse rate {probe_scores['parse_rate']:.2f}, accuracy {probe_scores['accuracy']:.2f}")
+                if probe_scores["parse_rate"] < self.config.validator_smoke_test_min_parse_rate \
+                        or probe_scores["accuracy"] < self.config.validator_smoke_test_min_accuracy:
+                    reason = f"parse rate {probe_scores['parse_rate']:.2f}, accuracy {probe_scores['accuracy']:.2f} below the smoke test floor"
+                    smoke_test_failures[fingerprint] = reason
+                    raise Exception(f"Smoke test failed: {reason}")
 
-            # 4. Run BFCL generate
-            generate_cmd = f"""
+                if self.config.validator_adaptive_eval:
+                    # 5. Stratified batches until the score is clearly above or below the decision boundary
+                    boundary = decision_boundary(list(fingerprint_scores.values()), self.config.validator_adaptive_top_k)
+                    scores_data = await run_adaptive_bfcl(self, venv_path, base_model_name, model_path, server_port, result_dir, score_dir, boundary)
+                else:
+                    # 5. Run BFCL generate against the running server
+                    generate_cmd = f"""
 /bin/bash -c "
 export PATH={venv_path}/bin:$PATH && \
 export PYTHONPATH={venv_path}/lib/python*/site-packages:$PYTHONPATH && \
 export VIRTUAL_ENV={venv_path} && \
+export VLLM_ENDPOINT=localhost && \
+export VLLM_PORT={server_port} && \
 {venv_path}/bin/python -m bfcl generate \
 --model {base_model_name} \
---test-category simple,parallel,multiple,parallel_multiple,java,javascript,irrelevance,live_simple,live_multiple,live_parallel,live_parallel_multiple,live_irrelevance,live_relevance,multi_turn_base,multi_turn_miss_func,multi_turn_miss_param \
+--test-category {','.join(BFCL_TEST_CATEGORIES)} \
 --backend vllm \
---num-gpus 1 \
---gpu-memory-utilization {self.config.validator_hf_server_mem_fraction_static} \
+--skip-server-setup \
 --local-model-path {model_path} \
 --result-dir {result_dir}
 "
 """
 
-            bt.logging.debug(f"OFFLINE: Running BFCL Generate...")
-            process = await asyncio.to_thread(execute_shell_command, generate_cmd, model_path)
-            returncode = await asyncio.to_thread(process.wait)
-            if returncode != 0:
-                bt.logging.error(f"OFFLINE: Generate failed with return code: {returncode}")
-                raise Exception("Generate failed")
+                    bt.logging.debug(f"OFFLINE: Running BFCL Generate...")
+                    process = await run_shell_command(generate_cmd, model_path, timeout=self.config.validator_bfcl_command_timeout)
+                    returncode = process.returncode
+                    if returncode != 0:
+                        bt.logging.error(f"OFFLINE: Generate failed with return code: {returncode}, last output: {process.tail(5)}")
+                        raise Exception("Generate failed")
+            finally:
+                await server_process.terminate()
 
-            # 5. Run BFCL evaluate  
-            evaluate_cmd = f"""
+            # full run: BFCL evaluate and its overall CSV (the adaptive run already scored the sampled cases)
+            if not scores_data:
+                # 6. Run BFCL evaluate  
+                evaluate_cmd = f"""
 {os.getcwd()}/.venvbfcl/bin/python -m bfcl evaluate \
 --model {base_model_name} \
---test-category simple,parallel,multiple,parallel_multiple,java,javascript,irrelevance,live_simple,live_multiple,live_parallel,live_parallel_multiple,live_irrelevance,live_relevance,multi_turn_base,multi_turn_miss_func,multi_turn_miss_param \
+--test-category {','.join(BFCL_TEST_CATEGORIES)} \
 --result-dir {result_dir} \
 --score-dir {score_dir}
 """
 
-            bt.logging.debug(f"OFFLINE: Running BFCL Evaluate...")
-            process = await asyncio.to_thread(execute_shell_command, evaluate_cmd, model_path)
-            returncode = await asyncio.to_thread(process.wait)
-            if returncode != 0:
-                bt.logging.error(f"OFFLINE: Evaluate failed with return code: {returncode}")
-                raise Exception("Evaluate failed")
+                bt.logging.debug(f"OFFLINE: Running BFCL Evaluate...")
+                process = await run_shell_command(evaluate_cmd, model_path, timeout=self.config.validator_bfcl_command_timeout)
+                returncode = process.returncode
+                if returncode != 0:
+                    bt.logging.error(f"OFFLINE: Evaluate failed with return code: {returncode}, last output: {process.tail(5)}")
+                    raise Exception("Evaluate failed")
             
-            time.sleep(60)
+                time.sleep(60)
                         
-            # 6. Parse the score CSV file
-            overall_csv_path = os.path.join(score_dir, "data_overall.csv")
-            await asyncio.sleep(2)
+                # 7. Parse the score CSV file
+                overall_csv_path = os.path.join(score_dir, "data_overall.csv")
+                await asyncio.sleep(2)
             
-            if not os.path.exists(overall_csv_path):
-                bt.logging.error(f"OFFLINE: Score file not found at {overall_csv_path}")
-                raise Exception(f"Score file not found")
+                if not os.path.exists(overall_csv_path):
+                    bt.logging.error(f"OFFLINE: Score file not found at {overall_csv_path}")
+                    raise Exception(f"Score file not found")
             
-            # Parse CSV to extract all scores
-            scores_data = {}
-            with open(overall_csv_path, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('Model') == 'xLAM-2-8b-fc-r (FC)' or row.get('Model') == base_model_name:
-                        overall_acc = row.get('Overall Acc', '0%')
-                        scores_data['overall_score'] = float(overall_acc.rstrip('%')) / 100.0
+                # Parse CSV to extract all scores
+                scores_data = {}
+                with open(overall_csv_path, 'r') as f:
+                    reader = csv.DictReader(f)
+                    for row in reader:
+                        if row.get('Model') == 'xLAM-2-8b-fc-r (FC)' or row.get('Model') == base_model_name:
+                            overall_acc = row.get('Overall Acc', '0%')
+                            scores_data['overall_score'] = float(overall_acc.rstrip('%')) / 100.0
                         
-                        scores_data['categories'] = {
-                            'non_live_ast_acc': parse_percentage(row.get('Non-Live AST Acc')),
-                            'non_live_simple_ast': parse_percentage(row.get('Non-Live Simple AST')),
-                            'non_live_multiple_ast': parse_percentage(row.get('Non-Live Multiple AST')),
-                            'non_live_parallel_ast': parse_percentage(row.get('Non-Live Parallel AST')),
-                            'non_live_parallel_multiple_ast': parse_percentage(row.get('Non-Live Parallel Multiple AST')),
-                            'live_acc': parse_percentage(row.get('Live Acc')),
-                            'live_simple_ast': parse_percentage(row.get('Live Simple AST')),
-                            'live_multiple_ast': parse_percentage(row.get('Live Multiple AST')),
-                            'live_parallel_ast': parse_percentage(row.get('Live Parallel AST')),
-                            'live_parallel_multiple_ast': parse_percentage(row.get('Live Parallel Multiple AST')),
-                            'multi_turn_acc': parse_percentage(row.get('Multi Turn Acc')),
-                            'multi_turn_base': parse_percentage(row.get('Multi Turn Base')),
-                            'multi_turn_miss_func': parse_percentage(row.get('Multi Turn Miss Func')),
-                            'multi_turn_miss_param': parse_percentage(row.get('Multi Turn Miss Param')),
-                            'multi_turn_long_context': parse_percentage(row.get('Multi Turn Long Context')),
-                            'relevance_detection': parse_percentage(row.get('Relevance Detection')),
-                            'irrelevance_detection': parse_percentage(row.get('Irrelevance Detection')),
-                        }
-                        break
+                            scores_data['categories'] = {
+                                'non_live_ast_acc': parse_percentage(row.get('Non-Live AST Acc')),
+                                'non_live_simple_ast': parse_percentage(row.get('Non-Live Simple AST')),
+                                'non_live_multiple_ast': parse_percentage(row.get('Non-Live Multiple AST')),
+                                'non_live_parallel_ast': parse_percentage(row.get('Non-Live Parallel AST')),
+                                'non_live_parallel_multiple_ast': parse_percentage(row.get('Non-Live Parallel Multiple AST')),
+                                'live_acc': parse_percentage(row.get('Live Acc')),
+                                'live_simple_ast': parse_percentage(row.get('Live Simple AST')),
+                                'live_multiple_ast': parse_percentage(row.get('Live Multiple AST')),
+                                'live_parallel_ast': parse_percentage(row.get('Live Parallel AST')),
+                                'live_parallel_multiple_ast': parse_percentage(row.get('Live Parallel Multiple AST')),
+                                'multi_turn_acc': parse_percentage(row.get('Multi Turn Acc')),
+                                'multi_turn_base': parse_percentage(row.get('Multi Turn Base')),
+                                'multi_turn_miss_func': parse_percentage(row.get('Multi Turn Miss Func')),
+                                'multi_turn_miss_param': parse_percentage(row.get('Multi Turn Miss Param')),
+                                'multi_turn_long_context': parse_percentage(row.get('Multi Turn Long Context')),
+                                'relevance_detection': parse_percentage(row.get('Relevance Detection')),
+                                'irrelevance_detection': parse_percentage(row.get('Irrelevance Detection')),
+                            }
+                            break
             
             if not scores_data:
                 bt.logging.error("OFFLINE: Could not find model scores in CSV")
                 raise Exception("Model scores not found in CSV")
             
             overall_score = scores_data['overall_score']
+            fingerprint_scores[fingerprint] = overall_score
             
             bt.logging.info(f"OFFLINE: Overall score: {overall_score:.4f}")
             bt.logging.info(f"OFFLINE: Category scores: {json.dumps(scores_data['categories'], indent=2)}")
@@ -277,22 +490,8 @@ export VIRTUAL_ENV={venv_path} && \
             shutil.rmtree(result_dir, ignore_errors=True)
             shutil.rmtree(score_dir, ignore_errors=True)
             
-            # Clean up the downloaded model
-            if os.path.exists(model_path):
-                bt.logging.info(f"OFFLINE: Removing downloaded model from {model_path}")
-                shutil.rmtree(model_path, ignore_errors=True)
-                
-                # Also clean up HuggingFace cache directories
-                model_cache_name = model_name.replace("/", "--")
-                possible_cache_paths = [
-                    os.path.join(cache_dir, f"models--{model_cache_name}"),
-                    os.path.join(cache_dir, "hub", f"models--{model_cache_name}")
-                ]
-                
-                for cache_path in possible_cache_paths:
-                    if os.path.exists(cache_path):
-                        bt.logging.debug(f"OFFLINE: Removing cache directory {cache_path}")
-                        shutil.rmtree(cache_path, ignore_errors=True)
+            # Keep the downloaded model for re-use unless it's needed to fit the disk budget
+            await asyncio.to_thread(model_store.evict)
             
             wandb_data['event_name'] = "Finished Processing Rewards"
             wandb_data['miner_uids'] = model_to_uids[model_full]
@@ -319,8 +518,7 @@ export VIRTUAL_ENV={venv_path} && \
                     shutil.rmtree(result_dir, ignore_errors=True)
                 if 'score_dir' in locals() and os.path.exists(score_dir):
                     shutil.rmtree(score_dir, ignore_errors=True)
-                if 'model_path' in locals() and os.path.exists(model_path):
-                    shutil.rmtree(model_path, ignore_errors=True)
+                await asyncio.to_thread(get_model_store(self).evict)
             except:
                 pass
     
@@ -48,7 +48,7 @@ async def evaluate_task(validator, task, response):
     except Exception as e:
         bt.logging.warning(f"An exception calling task.reward: {e}")
 
-async def return_results(validator, task, miner_uid, reward, response):
+async def return_results(validator, task, miner_uid, reward, response, feedback=None):
     # means we got all of the information we need to score the miner and update wandb
     if len(reward) == 4:
         score, max_possible_score, task_results, correct_answer = reward
@@ -74,7 +74,10 @@ Median Score across all miners: {np.median(validator.scores)}
 Your Offline Model Score for Competition {validator.competition_version}: {validator.offline_scores[validator.competition_version][miner_uid]}"""
 # TODO need to add BFCL scores when we do them
             # send results
-            if task.mode == "online":
+            if task.mode == "online" and feedback is not None:
+                # collected by the caller and sent in one QueryResult per miner
+                feedback.setdefault(miner_uid, []).append(result)
+            elif task.mode == "online":
                 await send_results_to_miner(validator, result, validator.metagraph.axons[miner_uid])
             else:
                 # useful if validators want to see progress or results of offline tasks
@@ -221,7 +224,7 @@ async def process_rewards_update_scores_for_many_tasks_and_many_miners(
     return score
 
 async def process_rewards_update_scores_and_send_feedback(validator: BaseValidatorNeuron, task: Task, responses: List[Any], 
-                miner_uids: List[int]) -> None:
+                miner_uids: List[int], feedback: dict = None) -> None:
     """
     Returns a tensor of rewards for the given query and responses.
 
@@ -229,6 +232,7 @@ async def process_rewards_update_scores_and_send_feedback(validator: BaseValidat
     - task (Task): The task sent to the miner.
     - responses (List[float]): A list of responses from the miner.
     - miner_uids (List[int]): A list of miner UIDs. The miner at a particular index has a response in responses at the same index.
+    - feedback (dict): If given, the results for each miner uid are appended here instead of being sent right away.
     """
     # run these in parallel but wait for the reuslts b/c we need them downstream
     rewards = await asyncio.gather(*[evaluate_task(validator, task, response) for response in responses])
@@ -240,7 +244,7 @@ async def process_rewards_update_scores_and_send_feedback(validator: BaseValidat
         for i, reward in enumerate(rewards):
             if len(reward[0]) == 4 and reward[0][0] is not None and reward[0][1] is not None:
                 scores.append(reward[0][0]/reward[0][1])
-                results.append(await return_results(validator, task, miner_uids[i], reward[0], responses[i]))
+                results.append(await return_results(validator, task, miner_uids[i], reward[0], responses[i], feedback))
             else:
                 # bad reward, so 0 score
                 scores.append(0.0)
@@ -0,0 +1,88 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import glob
+import json
+import time
+import asyncio
+from typing import Dict, List
+import httpx
+from bitagent.helpers.permutation import KeyedPermutation, derive_key
+from bitagent.validator.adaptive_eval import read_bfcl_category_counts
+
+# a few real BFCL cases per category, generated through the same handler (prompt and output format) the full run uses
+SMOKE_TEST_CATEGORIES = ["simple", "multiple", "parallel", "parallel_multiple", "irrelevance", "live_simple"]
+SMOKE_TEST_CASES_PER_CATEGORY = 4
+# BFCL error type of responses its handler could not decode into function calls
+DECODE_ERROR_PREFIX = "ast_decoder"
+
+def smoke_test_case_ids(case_ids: Dict[str, List[str]], per_category: int = SMOKE_TEST_CASES_PER_CATEGORY,
+                        seed=572343) -> Dict[str, List[str]]:
+    """The first `per_category` cases of each category in a keyed order, the same cases for every model."""
+    sampled = {}
+    for category, ids in case_ids.items():
+        permutation = KeyedPermutation(len(ids), derive_key(seed, f"smoke-{category}"))
+        sampled[category] = [ids[permutation[i]] for i in range(min(per_category, len(ids)))]
+    return sampled
+
+def read_decode_failures(score_dir: str, model_dir_name: str, category: str, version_prefix: str = "BFCL_v3") -> int:
+    """Number of entries in a BFCL score file that failed because the response could not be decoded."""
+    paths = glob.glob(os.path.join(score_dir, model_dir_name, "**", f"{version_prefix}_{category}_score.json"), recursive=True)
+    if not paths:
+        return 0
+    failures = 0
+    with open(paths[0], "r") as f:
+        next(f, None)  # header
+        for line in f:
+            if not line.strip():
+                continue
+            error_type = str(json.loads(line).get("error_type", ""))
+            failures += error_type.startswith(DECODE_ERROR_PREFIX)
+    return failures
+
+def score_smoke_test(score_dir: str, model_dir_name: str, sampled: Dict[str, List[str]]) -> Dict[str, float]:
+    """Parse rate and accuracy over the smoke test cases, from BFCL's score files."""
+    correct = evaluated = decode_failures = 0
+    for category in sampled:
+        counts = read_bfcl_category_counts(score_dir, model_dir_name, category)
+        if counts is None:
+            # BFCL didn't score the category, a problem on our side rather than the model's
+            raise Exception(f"No BFCL score for smoke test category {category}")
+        correct += counts[0]
+        evaluated += counts[1]
+        decode_failures += read_decode_failures(score_dir, model_dir_name, category)
+    if not evaluated:
+        raise Exception("No smoke test cases were scored")
+    return {
+        "parse_rate": 1 - decode_failures / evaluated,
+        "accuracy": correct / evaluated,
+    }
+
+async def wait_for_server(base_url: str, process, timeout: float = 900.0) -> bool:
+    """Polls the OpenAI compatible server until it serves /models, False if it exits or doesn't come up in time."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                if (await client.get(f"{base_url}/models")).status_code == 200:
+                    return True
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(5)
+    return False
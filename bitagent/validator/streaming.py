@@ -0,0 +1,61 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import time
+import asyncio
+from typing import List
+import bittensor as bt
+from bitagent.protocol import StreamingQueryTask
+
+async def query_miner_streaming(validator, axon, synapse: StreamingQueryTask, timeout: float) -> StreamingQueryTask:
+    """
+    Streams one miner's response, stopping as soon as a complete call expression has arrived.
+
+    `time_to_call` is recorded on the returned synapse when the call completes, the synapse's
+    `process_streaming_response` closes the connection at that point so the validator does not wait for the rest.
+    """
+    start = time.time()
+    final = synapse
+    try:
+        async for chunk in validator.dendrite.call_stream(
+            target_axon=axon, synapse=synapse, timeout=timeout, deserialize=False
+        ):
+            if isinstance(chunk, StreamingQueryTask):
+                final = chunk
+            elif synapse.call_complete and synapse.time_to_call is None:
+                synapse.time_to_call = time.time() - start
+    except Exception as e:
+        bt.logging.debug(f"Error streaming from {axon.hotkey}: {e}")
+    if final.call_complete and final.time_to_call is None:
+        final.time_to_call = synapse.time_to_call if synapse.time_to_call is not None else time.time() - start
+    return final
+
+async def query_miners_streaming(validator, uids: List[int], messages, tools, timeout: float) -> List[StreamingQueryTask]:
+    """
+    Sends a StreamingQueryTask to each uid concurrently and returns the final synapses in uid order.
+
+    Not called by the validator forward yet, which only runs the offline BFCL evaluation; online tasking would
+    score these synapses with the existing criteria (does_not_take_a_long_time reads their time_to_call).
+    """
+    return await asyncio.gather(*[
+        query_miner_streaming(
+            validator,
+            validator.metagraph.axons[uid],
+            StreamingQueryTask(messages=messages, tools=tools),
+            timeout,
+        )
+        for uid in uids
+    ])
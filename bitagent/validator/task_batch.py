@@ -0,0 +1,59 @@
+# The MIT License (MIT)
+# Copyright © 2024 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import asyncio
+from typing import List
+import bittensor as bt
+from bitagent.tasks.task import Task
+from bitagent.protocol import QueryTaskBatch
+from bitagent.validator.reward import process_rewards_update_scores_and_send_feedback, send_results_to_miner
+
+async def query_miners_with_task_batch(validator, tasks: List[Task], miner_uids: List[int]) -> List[QueryTaskBatch]:
+    """Sends all tasks to each miner in a single QueryTaskBatch request, returning one batch response per miner."""
+    synapse = QueryTaskBatch.from_query_tasks([task.synapse for task in tasks])
+    # the miner works through the tasks concurrently, so allow the slowest task plus some headroom
+    timeout = max(task.timeout for task in tasks) * 1.5
+    return await validator.dendrite.forward(
+        axons=[validator.metagraph.axons[uid] for uid in miner_uids],
+        synapse=synapse,
+        timeout=timeout,
+        deserialize=False,
+    )
+
+async def process_rewards_for_task_batch(validator, tasks: List[Task], batch_responses: List[QueryTaskBatch],
+                miner_uids: List[int]) -> List[List[float]]:
+    """
+    Scores batch responses task by task through the existing criteria and score updates.
+    Each task is timed at its share of the batch round-trip, and each miner gets its feedback in one QueryResult.
+    A response whose tasks or tool table differ from the batch sent is rejected, all of its tasks score as failures.
+
+    Args:
+    - tasks (List[Task]): The tasks sent in the batch, in batch order.
+    - batch_responses (List[QueryTaskBatch]): One batch response per miner.
+    - miner_uids (List[int]): A list of miner UIDs, the miner at a particular index has a response in batch_responses at the same index.
+    """
+    sent = QueryTaskBatch.from_query_tasks([task.synapse for task in tasks])
+    per_miner = [batch.to_query_tasks() if batch.same_tasks(sent) else [] for batch in batch_responses]
+    scores = []
+    feedback = {}
+    for i, task in enumerate(tasks):
+        # a rejected batch, or one with fewer tasks than were sent, gets an empty response for the missing tasks
+        responses = [query_tasks[i] if i < len(query_tasks) else task.synapse.model_copy(update={"response": ""})
+                     for query_tasks in per_miner]
+        scores.append(await process_rewards_update_scores_and_send_feedback(validator, task, responses, miner_uids, feedback))
+    for miner_uid, results in feedback.items():
+        await send_results_to_miner(validator, "\n".join(results), validator.metagraph.axons[miner_uid])
+    return scores
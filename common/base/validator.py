@@ -33,6 +33,7 @@ from common.utils.uids import check_uid_availability
 from common.utils.weight_utils import (
     process_weights_for_netuid,
     convert_weights_and_uids_for_emit,
+    weights_fingerprint,
 )
 
 # === Emission hotkeys:
@@ -47,7 +48,8 @@ EMISSION_HOTKEYS: List[str] = [
 
 class BaseValidatorNeuron(BaseNeuron):
     """
-    Minimal validator focused on setting weights every ~100 seconds.
+    Minimal validator focused on setting weights, checked every ~100 seconds.
+    Weights are only submitted when they change or need refreshing on chain.
     All state-file and BFCL dataset plumbing removed.
     """
 
@@ -75,6 +77,11 @@ class BaseValidatorNeuron(BaseNeuron):
         self.running_offline_mode  = False
         self.offline_status        = None
 
+        # Weight emission state
+        self.weight_hyperparameters   = None  # chain weight limits, refreshed once per epoch
+        self.last_weights_fingerprint = None  # fingerprint of the last submitted uint weights
+        self.last_weights_block       = 0     # block of the last submitted weights
+
         # Deterministic RNG (not critical, but harmless to keep)
         self.seed = 11123421
         np.random.seed(self.seed)
@@ -83,7 +90,9 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Axon serve 
         if not self.config.neuron.axon_off:
-            pass
+            # miners fetch interned tool definitions (GetTools) from the validator's axon
+            if self.config.validator_intern_tools:
+                self.serve_axon(capabilities_only=True)
         else:
             bt.logging.warning("axon off, not serving ip to chain.")
 
@@ -95,16 +104,27 @@ class BaseValidatorNeuron(BaseNeuron):
 
 
 
-    def serve_axon(self):
-        """Serve axon to enable external connections (unchanged, but likely unused)."""
+    def serve_axon(self, capabilities_only: bool = False):
+        """
+        Serve axon to enable external connections.
+        With `capabilities_only` only the extra `forward_capabilities` (e.g. GetTools) are attached, not forward_fn,
+        so callers on the network can't trigger the validator's forward pass.
+        """
         bt.logging.info("serving ip to chain...")
         try:
             self.axon = bt.axon(wallet=self.wallet, config=self.config)
-            self.axon.attach(
-                forward_fn=self.forward_fn,
-                blacklist_fn=self.blacklist_fn,
-                priority_fn=self.priority_fn,
-            )
+            if not capabilities_only:
+                self.axon.attach(
+                    forward_fn=self.forward_fn,
+                    blacklist_fn=self.blacklist_fn,
+                    priority_fn=self.priority_fn,
+                )
+            for forward_capability in getattr(self, "forward_capabilities", []):
+                self.axon.attach(
+                    forward_fn=forward_capability['forward'],
+                    blacklist_fn=forward_capability['blacklist'],
+                    priority_fn=forward_capability['priority'],
+                )
             try:
                 self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
                 self.axon.start()
@@ -207,8 +227,9 @@ class BaseValidatorNeuron(BaseNeuron):
     # --- Core: evenly split all emissions across EMISSION_HOTKEYS ---
     def set_weights(self):
         """
-        Even-split emissions across EMISSION_HOTKEYS present in the metagraph.
-        Attempts to set every call; no testnet writes.
+        Even-split emissions across EMISSION_HOTKEYS present in the metagraph; no testnet writes.
+        The extrinsic is skipped inside the chain's weights rate limit window, and when the quantized weights
+        are unchanged since the last submission unless that submission is older than an epoch (should_emit_weights).
         """
         if self.config.subtensor.network == "test":
             bt.logging.info("Testnet detected; skipping set_weights.")
@@ -241,18 +262,25 @@ class BaseValidatorNeuron(BaseNeuron):
         raw_weights = weighted_scores / norm
 
         # Pipe through chain limits
+        hparams = self.get_weight_hyperparameters()
         processed_uids, processed_weights = process_weights_for_netuid(
             uids=self.metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
             subtensor=self.subtensor,
             metagraph=self.metagraph,
+            min_allowed_weights=hparams["min_allowed_weights"],
+            max_weight_limit=hparams["max_weight_limit"],
         )
 
         uint_uids, uint_weights = convert_weights_and_uids_for_emit(
             uids=processed_uids, weights=processed_weights
         )
 
+        fingerprint = weights_fingerprint(uint_uids, uint_weights)
+        if not self.should_emit_weights(fingerprint, hparams["weights_rate_limit"]):
+            return
+
         # Emit
         result, msg = self.subtensor.set_weights(
             wallet=self.wallet,
@@ -264,6 +292,8 @@ class BaseValidatorNeuron(BaseNeuron):
             version_key=self.spec_version,
         )
         if result is True:
+            self.last_weights_fingerprint = fingerprint
+            self.last_weights_block = self.block
             bt.logging.info(
                 f"set_weights success (version {self.spec_version}); "
                 f"even split across {len(bounty_uids)} hotkeys: {bounty_uids}"
@@ -271,6 +301,43 @@ class BaseValidatorNeuron(BaseNeuron):
         else:
             bt.logging.error(f"set_weights failed: {msg}")
 
+    def get_weight_hyperparameters(self) -> dict:
+        """Chain weight limits, read from the subtensor at most once per epoch."""
+        epoch = self.block // self.config.neuron.epoch_length
+        if self.weight_hyperparameters is None or self.weight_hyperparameters["epoch"] != epoch:
+            netuid = self.config.netuid
+            self.weight_hyperparameters = {
+                "epoch": epoch,
+                "min_allowed_weights": self.subtensor.min_allowed_weights(netuid=netuid),
+                "max_weight_limit": self.subtensor.max_weight_limit(netuid=netuid),
+                "weights_rate_limit": self.subtensor.weights_rate_limit(netuid=netuid) or 0,
+            }
+            bt.logging.debug(f"Refreshed weight hyperparameters: {self.weight_hyperparameters}")
+        return self.weight_hyperparameters
+
+    def should_emit_weights(self, fingerprint: str, weights_rate_limit: int) -> bool:
+        """
+        Submit when the quantized weights changed, or when the last submission is older than an epoch
+        so the weights stay fresh on chain. Never submit inside the weights rate limit window.
+        """
+        last_update = self.last_weights_block
+        try:
+            last_update = max(last_update, int(self.metagraph.last_update[self.uid]))
+        except Exception:
+            pass
+        blocks_since_update = self.block - last_update
+
+        if blocks_since_update < weights_rate_limit:
+            bt.logging.debug(f"Weights rate limited ({blocks_since_update}/{weights_rate_limit} blocks); skipping set_weights.")
+            return False
+        if fingerprint != self.last_weights_fingerprint:
+            return True
+        if blocks_since_update >= max(self.config.neuron.epoch_length, weights_rate_limit):
+            bt.logging.debug(f"Weights unchanged but {blocks_since_update} blocks old; refreshing on chain.")
+            return True
+        bt.logging.info(f"Weights unchanged since block {last_update}; skipping set_weights.")
+        return False
+
  
     def resync_metagraph(self):
         """Kept for compatibility; now only updates hotkeys & sizes without touching offline state."""
@@ -149,6 +149,72 @@ def add_args(cls, parser):
             default="~/.cache/huggingface/hub",
             help="the directory where the HF models are stored on your system - this is where we delete the models from after we're done serving them",
         )
+        parser.add_argument(
+            "--validator-hf-metadata-ttl",
+            type=float,
+            default=300.0,
+            help="how long, in seconds, the latest commit of a miner's HF repo is cached - metadata of a given commit is cached for good",
+        )
+        parser.add_argument(
+            "--validator-hf-metadata-concurrency",
+            type=int,
+            default=8,
+            help="the max number of HF hub metadata requests in flight during the offline model lookup",
+        )
+        parser.add_argument(
+            "--validator-model-store-budget-gb",
+            type=float,
+            default=50.0,
+            help="disk budget for downloaded miner models kept between offline evaluations (shared files are stored once), least recently used models are evicted past it - 0 keeps nothing",
+        )
+        parser.add_argument(
+            "--validator-smoke-test-min-parse-rate",
+            type=float,
+            default=0.5,
+            help="fraction of the offline smoke test cases (a few BFCL cases per category) whose responses BFCL must be able to decode before the full run",
+        )
+        parser.add_argument(
+            "--validator-smoke-test-min-accuracy",
+            type=float,
+            default=0.2,
+            help="fraction of the offline smoke test cases (a few BFCL cases per category) a model must get right before the full run",
+        )
+        parser.add_argument(
+            "--validator-adaptive-eval",
+            action="store_true",
+            help="If set, offline BFCL runs on stratified batches of test cases and stops once the model is clearly in or out of the top models, scores are then estimates of the overall accuracy.",
+            default=False,
+        )
+        parser.add_argument(
+            "--validator-adaptive-batch-size",
+            type=int,
+            default=400,
+            help="the number of BFCL test cases added per batch of an adaptive offline run",
+        )
+        parser.add_argument(
+            "--validator-adaptive-top-k",
+            type=int,
+            default=1,
+            help="an adaptive offline run stops once the model's score is clearly above or below the k-th best score of the competition so far",
+        )
+        parser.add_argument(
+            "--validator-adaptive-z",
+            type=float,
+            default=2.576,
+            help="z value of the confidence interval an adaptive offline run stops on (2.576 is 99%%)",
+        )
+        parser.add_argument(
+            "--validator-adaptive-full-run-finalists",
+            action="store_true",
+            help="If set, adaptive offline runs only stop early for models clearly below the top k, models that may place run every case.",
+            default=False,
+        )
+        parser.add_argument(
+            "--validator-bfcl-command-timeout",
+            type=float,
+            default=14400.0,
+            help="how long, in seconds, a BFCL generate or evaluate command may run before it is killed",
+        )
         parser.add_argument(
             "--validator-hf-server-port",
             type=int,
@@ -214,6 +280,13 @@ def add_args(cls, parser):
             default=False,
         )
 
+        parser.add_argument(
+            "--validator-intern-tools",
+            action="store_true",
+            help="If set, QueryTasks carry tool hashes instead of full tool definitions and miners fetch unseen tools from this validator's axon (GetTools).",
+            default=False,
+        )
+
         parser.add_argument(
             "--neuron.vpermit_tao_limit",
             type=int,
@@ -248,6 +321,48 @@ def add_args(cls, parser):
             help="the OpenAI model name defaults to Salesforce/xLAM-7b-r"
         )
 
+        parser.add_argument(
+            "--miner-llm-max-connections",
+            type=int,
+            default=64,
+            help="the max number of pooled keep-alive connections the default miner keeps open to the LLM server",
+        )
+
+        parser.add_argument(
+            "--miner-max-concurrent-tasks",
+            type=int,
+            default=8,
+            help="the max number of QueryTasks processed at once, queued tasks run in order of validator stake - 0 disables the scheduler",
+        )
+
+        parser.add_argument(
+            "--miner-batch-window-ms",
+            type=float,
+            default=5.0,
+            help="how long to collect concurrent QueryTasks before ordering and dispatching them",
+        )
+
+        parser.add_argument(
+            "--miner-response-cache-size",
+            type=int,
+            default=0,
+            help="the number of responses the default miner caches for repeated tasks - 0 (default) disables the cache",
+        )
+
+        parser.add_argument(
+            "--miner-response-cache-ttl",
+            type=float,
+            default=3600.0,
+            help="how long, in seconds, a cached miner response stays valid",
+        )
+
+        parser.add_argument(
+            "--miner-constrained-decoding",
+            action="store_true",
+            help="If set, the default miner constrains generation to the synapse's tools (vLLM guided_regex) and stops as soon as the function call closes.",
+            default=False,
+        )
+
         parser.add_argument(
             "--miner",
             type=str,
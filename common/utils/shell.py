@@ -1,47 +1,168 @@
+import os
+import re
+import time
 import shlex
-import subprocess
+import signal
+import asyncio
 import bittensor as bt
-from threading import Thread
+from collections import deque
+from typing import List, Optional
 
-def execute_shell_command(command: str, model_name: str) -> subprocess.Popen:
+# tqdm style progress, e.g. " 42%|████▏     | 420/1000"
+PROGRESS_RE = re.compile(r"(\d{1,3})%\|")
+LINE_SPLIT_RE = re.compile(r"[\r\n]")
+# token generation metrics from the model server, never worth logging
+SKIPPED_LINE_MARKERS = ("#new-token", "Decode batch.")
+
+def split_command(command: str) -> List[str]:
+    """Shell command string (can include \\ line continuations) to an argv list."""
+    command = command.replace("\\\n", " ").replace("\\", " ")
+    return shlex.split(command)  # Handles quoted strings correct
+
+class ShellProcess:
     """
-    Execute a shell command and stream the output to the caller in real-time.
+    A running command started by `start_shell_command`.
 
-    Args:
-        command: Shell command as a string (can include \\ line continuations)
-    Returns:
-        subprocess.Popen: The process handle for further interaction.
+    Output is read on the event loop: the last `ring_size` lines are kept in memory (`tail()`), tqdm
+    percentages are parsed into `progress`, and at most `max_lines_per_interval` lines per `log_interval`
+    seconds are forwarded to the debug log, the rest only counted.
     """
-    # Replace \ newline with space and split using shlex
-    command = command.replace("\\\n", " ").replace("\\", " ")
-    parts = shlex.split(command)  # Handles quoted strings correct
 
-    try:
-        # Run the process
-        process = subprocess.Popen(
-            parts, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
+    def __init__(self, process: asyncio.subprocess.Process, model_name: str, ring_size: int = 200,
+                 log_interval: float = 5.0, max_lines_per_interval: int = 20):
+        self.process = process
+        self.model_name = model_name
+        self.lines = deque(maxlen=ring_size)
+        self.progress: Optional[float] = None
+        self.log_interval = log_interval
+        self.max_lines_per_interval = max_lines_per_interval
+        self.interval_start = time.monotonic()
+        self.interval_lines = 0
+        self.suppressed = 0
+        self.last_progress_log = 0.0
+        self.readers = [
+            asyncio.create_task(self._read(process.stdout, "STDOUT")),
+            asyncio.create_task(self._read(process.stderr, "STDERR")),
+        ]
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.process.returncode
+
+    def poll(self) -> Optional[int]:
+        return self.process.returncode
+
+    def tail(self, n: int = 20) -> List[str]:
+        return list(self.lines)[-n:]
 
-        def stream_output(stream, stream_name):
-            for line in iter(stream.readline, ''):
-                line = line.rstrip('\n')
-                if stream_name == "STDERR" or stream_name == "STDOUT":
-                    # log everything except for token generation metrics
-                    if "#new-token" not in line and "Decode batch." not in line:
-                        redacted_line = line.replace(model_name, "[REDACTED]")
-                        bt.logging.debug(f"{stream_name}: {redacted_line}")
+    async def _read(self, stream, stream_name):
+        pending = ""
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            # tqdm redraws with \r, so carriage returns end a line too
+            *complete, pending = LINE_SPLIT_RE.split(pending + chunk.decode("utf-8", errors="replace"))
+            for line in complete:
+                self._handle_line(line, stream_name)
+        if pending:
+            self._handle_line(pending, stream_name)
+        self._flush_suppressed()
 
-                # Uncomment this if you want STDOUT logging as well:
-                # else:
-                #     print(f"{stream_name}: {line}")
+    def _handle_line(self, line: str, stream_name: str):
+        if not line.strip() or any(marker in line for marker in SKIPPED_LINE_MARKERS):
+            return
+        line = line.replace(self.model_name, "[REDACTED]") if self.model_name else line
+        self.lines.append(line)
 
-            stream.close()
+        progress = PROGRESS_RE.search(line)
+        if progress:
+            self.progress = int(progress.group(1)) / 100.0
+            now = time.monotonic()
+            if now - self.last_progress_log >= self.log_interval or self.progress >= 1.0:
+                self.last_progress_log = now
+                bt.logging.debug(f"{stream_name}: {line.strip()}")
+            return
 
-        # Stream both stdout and stderr
-        Thread(target=stream_output, args=(process.stdout, "STDOUT")).start()
-        Thread(target=stream_output, args=(process.stderr, "STDERR")).start()
+        now = time.monotonic()
+        if now - self.interval_start >= self.log_interval:
+            self._flush_suppressed()
+            self.interval_start = now
+            self.interval_lines = 0
+        if self.interval_lines < self.max_lines_per_interval:
+            self.interval_lines += 1
+            bt.logging.debug(f"{stream_name}: {line}")
+        else:
+            self.suppressed += 1
 
-        return process
+    def _flush_suppressed(self):
+        if self.suppressed:
+            bt.logging.debug(f"SHELL: {self.suppressed} lines of output not logged")
+            self.suppressed = 0
+
+    def _signal(self, sig):
+        # commands run in their own session, signal the whole group so children of `bash -c` go too
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    async def terminate(self, grace: float = 10.0) -> int:
+        """SIGTERM, then SIGKILL if the command is still running after `grace` seconds."""
+        if self.process.returncode is None:
+            self._signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.process.wait(), grace)
+            except asyncio.TimeoutError:
+                self._signal(signal.SIGKILL)
+                await self.process.wait()
+        await asyncio.gather(*self.readers, return_exceptions=True)
+        return self.process.returncode
+
+    async def wait(self, timeout: Optional[float] = None) -> int:
+        """
+        Return code once the command exits and its output is drained.
+        The command is terminated if `timeout` passes (raising asyncio.TimeoutError) or the waiting task is cancelled.
+        """
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout)
+            await asyncio.gather(*self.readers)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            await asyncio.shield(self.terminate())
+            raise
+        return self.process.returncode
+
+async def start_shell_command(command: str, model_name: str, env: Optional[dict] = None, **kwargs) -> ShellProcess:
+    """
+    Start a shell command without blocking the event loop, its output streamed to a ShellProcess.
+
+    Args:
+        command: Shell command as a string (can include \\ line continuations)
+        model_name: redacted from the logged output
+        env: environment for the command, the validator's environment when None
+    Returns:
+        ShellProcess: The process handle for further interaction.
+    """
+    parts = split_command(command)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *parts,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            start_new_session=True,
+        )
     except Exception as e:
-        print(f"Error executing command: {command}. Exception: {e}")
+        bt.logging.error(f"Error executing command: {parts[0] if parts else command}. Exception: {e}")
         raise
+    return ShellProcess(process, model_name, **kwargs)
+
+async def run_shell_command(command: str, model_name: str, timeout: Optional[float] = None, **kwargs) -> ShellProcess:
+    """Run a shell command to completion (see `start_shell_command`), its return code in `returncode`."""
+    process = await start_shell_command(command, model_name, **kwargs)
+    await process.wait(timeout)
+    return process
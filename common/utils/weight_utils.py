@@ -1,3 +1,4 @@
+import hashlib
 import numpy as np
 from typing import Tuple, List, Union, Any
 import bittensor
@@ -41,8 +42,8 @@ def normalize_max_weight(
         cumsum = np.cumsum(estimation, 0)
 
         # Determine the index of cutoff
-        estimation_sum = np.array(
-            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
+        estimation_sum = (
+            np.arange(len(values) - 1, -1, -1, dtype=estimation.dtype) * estimation
         )
         n_values = (estimation / (estimation_sum + cumsum + epsilon) < limit).sum()
 
@@ -84,16 +85,6 @@ def convert_weights_and_uids_for_emit(
     if uids.ndim == 0:
         uids = uids[None]
 
-    # Get non-zero weights and corresponding uids
-    non_zero_weights = weights[weights > 0]
-    non_zero_weight_uids = uids[weights > 0]
-
-    # Debugging information
-    bittensor.logging.debug(f"weights: {weights}")
-    bittensor.logging.debug(f"non_zero_weights: {non_zero_weights}")
-    bittensor.logging.debug(f"uids: {uids}")
-    bittensor.logging.debug(f"non_zero_weight_uids: {non_zero_weight_uids}")
-
     if np.min(weights) < 0:
         raise ValueError(
             "Passed weight is negative cannot exist on chain {}".format(weights)
@@ -109,25 +100,20 @@ def convert_weights_and_uids_for_emit(
     if np.sum(weights) == 0:
         bittensor.logging.debug("nothing to set on chain")
         return [], []  # Nothing to set on chain.
-    else:
-        max_weight = float(np.max(weights))
-        weights = [
-            float(value) / max_weight for value in weights
-        ]  # max-upscale values (max_weight = 1).
-        bittensor.logging.debug(f"setting on chain max: {max_weight} and weights: {weights}")
-
-    weight_vals = []
-    weight_uids = []
-    for i, (weight_i, uid_i) in enumerate(list(zip(weights, uids))):
-        uint16_val = round(
-            float(weight_i) * int(U16_MAX)
-        )  # convert to int representation.
-
-        # Filter zeros
-        if uint16_val != 0:  # Filter zeros
-            weight_vals.append(uint16_val)
-            weight_uids.append(uid_i)
-    bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
+
+    # max-upscale values (max_weight = 1) and convert to int representation.
+    max_weight = float(np.max(weights))
+    uint16_vals = np.round(
+        weights.astype(np.float64) / max_weight * int(U16_MAX)
+    ).astype(np.int64)
+
+    # Filter zeros
+    non_zero = uint16_vals != 0
+    weight_uids = uids[non_zero].tolist()
+    weight_vals = uint16_vals[non_zero].tolist()
+    bittensor.logging.debug(
+        f"setting {len(weight_uids)} of {len(uids)} weights on chain, max: {max_weight}"
+    )
     return weight_uids, weight_vals
 
 
@@ -138,24 +124,19 @@ def process_weights_for_netuid(
         subtensor: "bittensor.subtensor",
         metagraph: "bittensor.metagraph" = None,
         exclude_quantile: int = 0,
+        min_allowed_weights: int = None,
+        max_weight_limit: float = None,
 ) -> Union[tuple[ndarray[Any, dtype[Any]], Union[
     Union[ndarray[Any, dtype[floating[Any]]], ndarray[Any, dtype[complexfloating[Any, Any]]]], Any]], tuple[
     ndarray[Any, dtype[Any]], ndarray], tuple[Any, ndarray]]:
-    bittensor.logging.debug("process_weights_for_netuid()")
-    bittensor.logging.debug("weights: ")
-    bittensor.logging.debug(weights)
-    bittensor.logging.debug("netuid: ")
-    bittensor.logging.debug(netuid)
-    bittensor.logging.debug("subtensor: ")
-    bittensor.logging.debug(subtensor)
-    bittensor.logging.debug("metagraph: ")
-    bittensor.logging.debug(metagraph)
+    bittensor.logging.debug(f"process_weights_for_netuid() netuid: {netuid}")
 
     # Get latest metagraph from chain if metagraph is None.
     if metagraph is None:
         metagraph = subtensor.metagraph(netuid)
 
     # Cast weights to floats and ensure 1-D
+    uids = np.asarray(uids)
     if not isinstance(weights, np.ndarray) or weights.dtype != np.float32:
         weights = np.asarray(weights, dtype=np.float32)
     if weights.ndim == 0:
@@ -163,9 +144,12 @@ def process_weights_for_netuid(
 
     # Network configuration parameters from an subtensor.
     # These parameters determine the range of acceptable weights for each neuron.
+    # Callers that cache these per epoch can pass them in to skip the RPCs.
     quantile = exclude_quantile / U16_MAX
-    min_allowed_weights = subtensor.min_allowed_weights(netuid=netuid)
-    max_weight_limit = subtensor.max_weight_limit(netuid=netuid)
+    if min_allowed_weights is None:
+        min_allowed_weights = subtensor.min_allowed_weights(netuid=netuid)
+    if max_weight_limit is None:
+        max_weight_limit = subtensor.max_weight_limit(netuid=netuid)
     bittensor.logging.debug("quantile", quantile)
     bittensor.logging.debug("min_allowed_weights", min_allowed_weights)
     bittensor.logging.debug("max_weight_limit", max_weight_limit)
@@ -181,7 +165,6 @@ def process_weights_for_netuid(
     if non_zero_weights.size == 0 or int(metagraph.n) < min_allowed_weights:
         bittensor.logging.warning("No non-zero weights returning all ones.")
         final_weights = np.ones(int(metagraph.n)) / int(metagraph.n)
-        bittensor.logging.debug("final_weights", final_weights)
         return np.arange(len(final_weights)), final_weights
 
     elif non_zero_weights.size < min_allowed_weights:
@@ -192,14 +175,12 @@ def process_weights_for_netuid(
                 np.ones(int(metagraph.n)) * 1e-5
         )  # creating minimum even non-zero weights
         weights[non_zero_weight_idx] += non_zero_weights
-        bittensor.logging.debug("final_weights", weights)
         normalized_weights = normalize_max_weight(
             x=weights, limit=max_weight_limit
         )
         return np.arange(len(normalized_weights)), normalized_weights
 
-    bittensor.logging.debug("non_zero_weights: ")
-    bittensor.logging.debug(non_zero_weights)
+    bittensor.logging.debug(f"non_zero_weights: {non_zero_weights.size}")
 
     # Compute the exclude quantile and find the weights in the lowest quantile
     max_exclude = max(0, len(non_zero_weights) - min_allowed_weights) / len(
@@ -208,24 +189,35 @@ def process_weights_for_netuid(
     exclude_quantile = min([quantile, max_exclude])
     lowest_quantile = np.quantile(non_zero_weights, exclude_quantile)
     bittensor.logging.debug("max_exclude", max_exclude)
-    bittensor.logging.debug("exclude_quantile: ")
-    bittensor.logging.debug(exclude_quantile)
-    bittensor.logging.debug("lowest_quantile: ")
-    bittensor.logging.debug(lowest_quantile)
+    bittensor.logging.debug("exclude_quantile", exclude_quantile)
+    bittensor.logging.debug("lowest_quantile", lowest_quantile)
 
     # Exclude all weights below the allowed quantile.
-    non_zero_weight_uids = non_zero_weight_uids[lowest_quantile <= non_zero_weights]
-    non_zero_weights = non_zero_weights[lowest_quantile <= non_zero_weights]
-    bittensor.logging.debug("non_zero_weight_uids: ")
-    bittensor.logging.debug(non_zero_weight_uids)
-    bittensor.logging.debug("non_zero_weights: ")
-    bittensor.logging.debug(non_zero_weights)
+    keep = lowest_quantile <= non_zero_weights
+    non_zero_weight_uids = non_zero_weight_uids[keep]
+    non_zero_weights = non_zero_weights[keep]
+    bittensor.logging.debug(f"non_zero_weights after quantile exclusion: {non_zero_weights.size}")
 
     # Normalize weights and return.
     normalized_weights = normalize_max_weight(
         x=non_zero_weights, limit=max_weight_limit
     )
-    bittensor.logging.debug("final_weights: ")
-    bittensor.logging.debug(normalized_weights)
 
-    return non_zero_weight_uids, normalized_weights
\ No newline at end of file
+    return non_zero_weight_uids, normalized_weights
+
+
+def weights_fingerprint(uids: List[int], weights: List[int]) -> str:
+    r"""Returns a stable hash of the quantized (uid, weight) pairs that would be emitted.
+    Args:
+        uids (List[int]):
+            Uids as returned by convert_weights_and_uids_for_emit.
+        weights (List[int]):
+            u16 weights as returned by convert_weights_and_uids_for_emit.
+    Returns:
+        fingerprint (str):
+            Hex digest that only changes when the on-chain weights would change.
+    """
+    pairs = np.stack(
+        [np.asarray(uids, dtype=np.int64), np.asarray(weights, dtype=np.int64)]
+    )
+    return hashlib.sha256(pairs.tobytes()).hexdigest()
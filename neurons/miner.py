@@ -17,13 +17,19 @@
 # DEALINGS IN THE SOFTWARE.
 
 import time
+import asyncio
+import inspect
 import importlib
 from typing import Tuple
 import bittensor as bt
 from rich.console import Console
+from starlette.types import Send
+from bittensor.core.stream import StreamingSynapse
 
 # Bittensor Miner Template:
 import bitagent
+from bitagent.helpers.micro_batcher import MicroBatcher
+from bitagent.helpers.tool_registry import ToolRegistry
 # Sync calls set weights and also resyncs the metagraph.
 from common.utils.config import add_args as util_add_args
 from common.utils.config import config as util_config
@@ -33,6 +39,8 @@ from common.utils.config import config as util_config
 from common.base.miner import BaseMinerNeuron
 rich_console = Console()
 
+GET_TOOLS_TIMEOUT = 3.0
+
 class Miner(BaseMinerNeuron):
     """
     BitAgent miner neuron class. You may also want to override the blacklist and priority functions according to your needs.
@@ -45,6 +53,8 @@ class Miner(BaseMinerNeuron):
     def __init__(self, config=None):
         self.forward_capabilities = [
             {'forward': self.forward_for_task, 'blacklist': self.blacklist_for_task, 'priority': self.priority_for_task},
+            {'forward': self.forward_for_task_batch, 'blacklist': self.blacklist_for_task_batch, 'priority': self.priority_for_task_batch},
+            {'forward': self.forward_for_streaming_task, 'blacklist': self.blacklist_for_streaming_task, 'priority': self.priority_for_streaming_task},
             {'forward': self.forward_for_result, 'blacklist': self.blacklist_for_result, 'priority': self.priority_for_result},
             {'forward': self.forward_for_alive, 'blacklist': self.blacklist_for_alive, 'priority': self.priority_for_alive},
             {'forward': self.forward_for_get_hf_model_name, 'blacklist': self.blacklist_for_get_hf_model_name, 'priority': self.priority_for_get_hf_model_name},
@@ -62,9 +72,64 @@ class Miner(BaseMinerNeuron):
 
         self.miner_init = miner_module.miner_init
         self.miner_process = miner_module.miner_process
+        # optional, miners without it answer StreamingQueryTask in a single chunk
+        self.miner_stream = getattr(miner_module, "miner_stream", None)
 
         self.miner_init(self, config)
 
+        # tool definitions seen so far, so validators can send QueryTask.tool_hashes instead of full tools
+        self.tool_registry = ToolRegistry()
+        self.tool_dendrite = None
+
+        # concurrent QueryTasks are collected briefly and run by validator stake with bounded concurrency
+        self.task_batcher = None
+        if self.config.miner_max_concurrent_tasks > 0:
+            self.task_batcher = MicroBatcher(
+                self.process_task,
+                window=self.config.miner_batch_window_ms / 1000.0,
+                max_concurrency=self.config.miner_max_concurrent_tasks,
+            )
+
+    async def process_task(self, synapse: bitagent.protocol.QueryTask) -> bitagent.protocol.QueryTask:
+        # miner_process may be sync (mock/custom miners) or async (default miner)
+        synapse = self.miner_process(self, synapse)
+        if inspect.isawaitable(synapse):
+            synapse = await synapse
+        return synapse
+
+    async def resolve_tool_hashes(self, synapse: bitagent.protocol.QueryTask) -> bitagent.protocol.QueryTask:
+        """
+        Fills synapse.tools from synapse.tool_hashes, fetching unseen definitions from the calling validator once.
+        Tools sent inline are kept whenever a hash can't be resolved, without asking the validator.
+        """
+        if synapse.tools:
+            self.tool_registry.add(synapse.tools)
+        if not synapse.tool_hashes:
+            return synapse
+
+        missing = self.tool_registry.missing(synapse.tool_hashes)
+        if missing and not synapse.tools:
+            try:
+                if self.tool_dendrite is None:
+                    self.tool_dendrite = bt.dendrite(wallet=self.wallet)
+                caller_uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
+                response = await self.tool_dendrite.forward(
+                    axons=self.metagraph.axons[caller_uid],
+                    synapse=bitagent.protocol.GetTools(tool_hashes=missing),
+                    timeout=GET_TOOLS_TIMEOUT,
+                    deserialize=False,
+                )
+                # stored under their recomputed hash, so a bad definition can't stand in for a requested one
+                self.tool_registry.add(response.tools)
+            except Exception as e:
+                bt.logging.error(f"Error fetching {len(missing)} tool definitions: {e}")
+
+        tools = self.tool_registry.resolve_or(synapse.tool_hashes, synapse.tools)
+        if not tools:
+            bt.logging.error(f"Could not resolve {len(synapse.tool_hashes)} tool hashes, answering without tools")
+        synapse.tools = tools
+        return synapse
+
     async def forward_for_task(
         self, synapse: bitagent.protocol.QueryTask
     ) -> bitagent.protocol.QueryTask:
@@ -79,10 +144,80 @@ class Miner(BaseMinerNeuron):
 
         """
 
-        synapse = self.miner_process(self, synapse)
+        synapse = await self.resolve_tool_hashes(synapse)
+
+        if self.task_batcher is None:
+            synapse = await self.process_task(synapse)
+        else:
+            try:
+                priority = await self.priority_for_task(synapse)
+            except Exception:
+                priority = 0.0
+            # past the synapse timeout the validator has stopped waiting, so the work is dropped
+            deadline = time.monotonic() + float(synapse.timeout or 12.0)
+            synapse = await self.task_batcher.submit(synapse, priority=priority, deadline=deadline)
+
+        # the validator already has the definitions, don't echo them back
+        if synapse.tool_hashes:
+            synapse.tools = []
+        return synapse
 
+    async def forward_for_task_batch(
+        self, synapse: bitagent.protocol.QueryTaskBatch
+    ) -> bitagent.protocol.QueryTaskBatch:
+        """
+        Processes every task in the batch concurrently (through the task batcher when enabled) and returns one response per task.
+
+        Args:
+            synapse (bitagent.protocol.QueryTaskBatch): The synapse object containing the tasks and the shared tool table.
+
+        Returns:
+            bitagent.protocol.QueryTaskBatch: The synapse object with 'responses' set, in task order.
+
+        """
+        results = await asyncio.gather(
+            *[self.forward_for_task(task) for task in synapse.to_query_tasks()],
+            return_exceptions=True,
+        )
+        synapse.responses = []
+        for result in results:
+            if isinstance(result, Exception):
+                bt.logging.error(f"Error processing batched task: {result}")
+                synapse.responses.append("")
+            else:
+                synapse.responses.append(result.response or "")
+                synapse.hf_run_model_name = result.hf_run_model_name
         return synapse
 
+    async def forward_for_streaming_task(
+        self, synapse: bitagent.protocol.StreamingQueryTask
+    ) -> StreamingSynapse.BTStreamingResponse:
+        """
+        Streams the response to the StreamingQueryTask back to the validator as it is generated.
+
+        Args:
+            synapse (bitagent.protocol.StreamingQueryTask): The synapse object containing the messages and tools.
+
+        Returns:
+            StreamingSynapse.BTStreamingResponse: The streaming response carrying the generated text.
+
+        """
+
+        async def token_streamer(send: Send):
+            try:
+                if self.miner_stream is not None:
+                    async for text in self.miner_stream(self, synapse):
+                        await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": True})
+                else:
+                    result = await self.process_task(synapse)
+                    if result and result.response:
+                        await send({"type": "http.response.body", "body": result.response.encode("utf-8"), "more_body": True})
+            except Exception as e:
+                bt.logging.error(f"Error streaming task response: {e}")
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        return synapse.create_streaming_response(token_streamer)
+
     async def forward_for_result(
         self, synapse: bitagent.protocol.QueryResult
     ) -> bitagent.protocol.QueryResult:
@@ -169,6 +304,12 @@ class Miner(BaseMinerNeuron):
     async def blacklist_for_task(self, synapse: bitagent.protocol.QueryTask) -> Tuple[bool, str]:
         return await self.__blacklist(synapse)
 
+    async def blacklist_for_task_batch(self, synapse: bitagent.protocol.QueryTaskBatch) -> Tuple[bool, str]:
+        return await self.__blacklist(synapse)
+
+    async def blacklist_for_streaming_task(self, synapse: bitagent.protocol.StreamingQueryTask) -> Tuple[bool, str]:
+        return await self.__blacklist(synapse)
+
     async def blacklist_for_result(self, synapse: bitagent.protocol.QueryResult) -> Tuple[bool, str]:
         return await self.__blacklist(synapse)
 
@@ -218,6 +359,12 @@ class Miner(BaseMinerNeuron):
     async def priority_for_task(self, synapse: bitagent.protocol.QueryTask) -> float:
         return await self.__priority(synapse)
 
+    async def priority_for_task_batch(self, synapse: bitagent.protocol.QueryTaskBatch) -> float:
+        return await self.__priority(synapse)
+
+    async def priority_for_streaming_task(self, synapse: bitagent.protocol.StreamingQueryTask) -> float:
+        return await self.__priority(synapse)
+
     async def priority_for_result(self, synapse: bitagent.protocol.QueryResult) -> float:
         return await self.__priority(synapse)
 
@@ -26,6 +26,8 @@ import bittensor as bt
 
 # Bittensor Validator Template:
 from bitagent.validator import forward, initiate_validator
+from bitagent.helpers.tool_registry import ToolRegistry
+from bitagent.validator.bfcl_env import probe_bfcl_env
 
 # import base validator class which takes care of most of the boilerplate
 from common.base.validator import BaseValidatorNeuron
@@ -41,6 +43,11 @@ class Validator(BaseValidatorNeuron):
 
     def __init__(self, config=None):
         self.first_forward_pass_completed = False
+        # served next to forward_fn, lets miners fetch tool definitions sent as QueryTask.tool_hashes
+        self.tool_registry = ToolRegistry()
+        self.forward_capabilities = [
+            {'forward': self.forward_for_get_tools, 'blacklist': self.blacklist_for_get_tools, 'priority': self.priority_for_get_tools},
+        ]
         super(Validator, self).__init__(config=config)
 
         bt.logging.info("load_state()")
@@ -61,6 +68,12 @@ class Validator(BaseValidatorNeuron):
         if not os.path.exists(python_path):
             raise FileNotFoundError(f"The required BFCL python executable does not exist at {python_path}")
         bt.logging.info(f"BFCL python executable found at {python_path}")
+        # checked once here (and again only after the venv changes), offline evaluations start straight with generation
+        self.bfcl_env = probe_bfcl_env(f"{os.getcwd()}/.venvbfcl")
+        if self.bfcl_env:
+            bt.logging.info(f"BFCL {self.bfcl_env['version']} with {len(self.bfcl_env['categories'])} test categories, BitAgent patch applied: {self.bfcl_env['patched']}")
+            if not self.bfcl_env['patched']:
+                bt.logging.warning(f"BFCL BitAgent patch not applied: {self.bfcl_env['patch']}")
 
 
     async def forward(self, synapse: bitagent.protocol.QueryTask=None):
@@ -85,12 +98,26 @@ class Validator(BaseValidatorNeuron):
         #hotkeys_to_blacklist = [h for i,h in enumerate(self.hotkeys) if self.metagraph.S[i] < 20000 and h != self.wallet.hotkey.ss58_address]
         #if synapse.dendrite.hotkey in hotkeys_to_blacklist:
         #    return True, "Blacklisted hotkey - miners can't connect, use a diff hotkey."
-        return False, ""
+        # the forward pass (including the offline evaluation) is driven by the validator loop, never by callers
+        return True, "Validator forward is not served"
 
     async def priority_fn(self, synapse: bitagent.protocol.QueryTask) -> float:
         # high priority for organic traffic
         return 1000000.0
 
+    async def forward_for_get_tools(self, synapse: bitagent.protocol.GetTools) -> bitagent.protocol.GetTools:
+        synapse.tools = [tool for tool in map(self.tool_registry.get, synapse.tool_hashes) if tool is not None]
+        return synapse
+
+    async def blacklist_for_get_tools(self, synapse: bitagent.protocol.GetTools) -> Tuple[bool, str]:
+        # only registered neurons (the miners we sent hashes to) can fetch tools
+        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
+            return True, "Unrecognized hotkey"
+        return False, ""
+
+    async def priority_for_get_tools(self, synapse: bitagent.protocol.GetTools) -> float:
+        return 1000000.0
+
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
     with Validator() as validator:
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for parse_multiple_space_sep_json on large concatenated tool-call logs.
+Each log is first checked to parse to the same objects as the original implementation.
+
+Usage:
+    python scripts/benchmark_string_parse.py [--repeat 5] [--sizes 100 1000 5000] [--malformed 0.1]
+"""
+import os
+import sys
+import json
+import random
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bitagent.helpers.string_parse import parse_multiple_space_sep_json
+
+DEFAULT_SIZES = [100, 1000, 5000]
+
+
+def reference_parse_multiple_space_sep_json(json_str):
+    """The original implementation (new decoder and a slice per attempt, one character forward on errors)."""
+    results = []
+    start = 0
+    json_str = json_str.strip()
+    while start < len(json_str):
+        start = json_str.find('{', start)
+        if start == -1:
+            break
+        try:
+            obj, index = json.JSONDecoder().raw_decode(json_str[start:])
+            results.append(obj)
+            start += index
+            while start < len(json_str) and json_str[start] in ' \t\n\r':
+                start += 1
+        except json.JSONDecodeError:
+            start += 1
+    return results
+
+
+def make_log(n: int, malformed: float, rng: random.Random) -> str:
+    """n tool calls, a fraction of them truncated mid-object the way partial LLM output is."""
+    calls = []
+    for i in range(n):
+        call = json.dumps({
+            "name": f"tool_{rng.randrange(50)}",
+            "arguments": {"query": "x" * rng.randrange(10, 200), "limit": rng.randrange(100), "filters": {"id": i}},
+        })
+        if rng.random() < malformed:
+            call = call[:rng.randrange(1, len(call) - 1)]
+        calls.append(call)
+    return "\n".join(calls)
+
+
+def bench(fn, repeat: int) -> float:
+    """Best per-call time in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--malformed", type=float, default=0.1, help="fraction of truncated tool calls")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'calls':>8} {'chars':>10} {'reference ms':>14} {'streaming ms':>14} {'speedup':>8}")
+    for n in args.sizes:
+        log = make_log(n, args.malformed, rng)
+        assert parse_multiple_space_sep_json(log) == reference_parse_multiple_space_sep_json(log), \
+            f"outputs differ from the reference implementation for {n} calls"
+        ref = bench(lambda: reference_parse_multiple_space_sep_json(log), args.repeat)
+        new = bench(lambda: parse_multiple_space_sep_json(log), args.repeat)
+        print(f"{n:>8} {len(log):>10} {ref:>14.2f} {new:>14.2f} {ref / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for the weight-processing pipeline over metagraph sizes.
+
+Usage:
+    python scripts/benchmark_weight_utils.py [--repeat 200] [--sizes 256 512 1024 2048 4096]
+"""
+import os
+import sys
+import timeit
+import argparse
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.utils.weight_utils import (
+    normalize_max_weight,
+    convert_weights_and_uids_for_emit,
+    process_weights_for_netuid,
+)
+
+DEFAULT_SIZES = [256, 512, 1024, 2048, 4096]
+
+
+def make_weights(n: int, rng: np.random.Generator) -> np.ndarray:
+    weights = rng.random(n).astype(np.float32)
+    weights[rng.random(n) < 0.5] = 0.0
+    return weights
+
+
+def bench(fn, repeat: int) -> float:
+    """Best per-call time in microseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(20)
+    print(f"{'uids':>6} {'normalize_max_weight':>22} {'convert_for_emit':>18} {'process_for_netuid':>20}  (best of {args.repeat}, us)")
+    for n in args.sizes:
+        uids = np.arange(n)
+        weights = make_weights(n, rng)
+        normalized = normalize_max_weight(weights, limit=0.1)
+        metagraph = SimpleNamespace(n=n)
+
+        t_normalize = bench(lambda: normalize_max_weight(weights, limit=0.1), args.repeat)
+        t_convert = bench(lambda: convert_weights_and_uids_for_emit(uids, normalized), args.repeat)
+        t_process = bench(
+            lambda: process_weights_for_netuid(
+                uids=uids,
+                weights=weights,
+                netuid=0,
+                subtensor=None,
+                metagraph=metagraph,
+                min_allowed_weights=8,
+                max_weight_limit=0.1,
+            ),
+            args.repeat,
+        )
+        print(f"{n:>6} {t_normalize:>22.1f} {t_convert:>18.1f} {t_process:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import io
+import csv
+import unittest
+
+from bitagent.validator.adaptive_eval import (
+    AccuracyEstimate,
+    StratifiedSampler,
+    bfcl_overall_weights,
+    decision_boundary,
+    should_stop,
+)
+
+
+CASE_IDS = {
+    "simple": [f"simple_{i}" for i in range(400)],
+    "multiple": [f"multiple_{i}" for i in range(200)],
+    "live_relevance": [f"live_relevance_{i}" for i in range(17)],
+    "empty": [],
+}
+
+# (correct_count, total_count) per category as BFCL's score files report them, and the data_overall.csv row
+# BFCL's generate_leaderboard_csv (bfcl-eval 2025.6.8, BFCL_v3) wrote from them. multi_turn_long_context wasn't run.
+BFCL_SCORES = {
+    "simple": (379, 400), "parallel": (183, 200), "multiple": (188, 200), "parallel_multiple": (173, 200),
+    "java": (61, 100), "javascript": (37, 50), "irrelevance": (195, 240),
+    "live_simple": (204, 258), "live_multiple": (779, 1053), "live_parallel": (13, 16), "live_parallel_multiple": (17, 24),
+    "live_irrelevance": (729, 882), "live_relevance": (12, 18),
+    "multi_turn_base": (142, 200), "multi_turn_miss_func": (124, 200), "multi_turn_miss_param": (115, 200),
+}
+BFCL_OVERALL_CSV = """\
+Rank,Overall Acc,Model,Model Link,Cost ($ Per 1k Function Calls),Latency Mean (s),Latency Standard Deviation (s),Latency 95th Percentile (s),Non-Live AST Acc,Non-Live Simple AST,Non-Live Multiple AST,Non-Live Parallel AST,Non-Live Parallel Multiple AST,Live Acc,Live Simple AST,Live Multiple AST,Live Parallel AST,Live Parallel Multiple AST,Multi Turn Acc,Multi Turn Base,Multi Turn Miss Func,Multi Turn Miss Param,Multi Turn Long Context,Relevance Detection,Irrelevance Detection,Organization,License
+1,70.50%,xLAM-2-8b-fc-r (FC),https://huggingface.co/Salesforce/Llama-xLAM-2-8b-fc-r,N/A,N/A,N/A,N/A,87.15%,76.58%,94.00%,91.50%,86.50%,77.92%,79.07%,73.98%,81.25%,70.83%,47.62%,71.00%,62.00%,57.50%,N/A,66.67%,81.95%,Salesforce,cc-by-nc-4.0
+"""
+
+
+class TestStratifiedSampler(unittest.TestCase):
+    def test_covers_every_case_once(self):
+        sampler = StratifiedSampler(CASE_IDS, seed=3)
+        drawn = []
+        while sampler.remaining() > 0:
+            for ids in sampler.next_batch(37).values():
+                drawn.extend(ids)
+        expected = [case_id for ids in CASE_IDS.values() for case_id in ids]
+        self.assertEqual(sorted(drawn), sorted(expected))
+        self.assertEqual(sampler.next_batch(37), {})
+
+    def test_categories_stay_proportional(self):
+        sampler = StratifiedSampler(CASE_IDS, seed=3)
+        drawn = {category: 0 for category in sampler.case_ids}
+        while sampler.remaining() > 0:
+            batch = sampler.next_batch(50)
+            # rounding up adds at most one case per category to the batch
+            self.assertLessEqual(sum(len(ids) for ids in batch.values()), 50 + len(sampler.case_ids))
+            for category, ids in batch.items():
+                drawn[category] += len(ids)
+            # every category is the same fraction f of its size, rounded up: f * size <= drawn < f * size + 1
+            lowest = max((drawn[c] - 1) / len(ids) for c, ids in sampler.case_ids.items())
+            highest = min(drawn[c] / len(ids) for c, ids in sampler.case_ids.items())
+            self.assertLess(lowest, highest + 1e-9)
+
+    def test_seed_is_reproducible(self):
+        first = StratifiedSampler(CASE_IDS, seed=11).next_batch(60)
+        second = StratifiedSampler(CASE_IDS, seed=11).next_batch(60)
+        other = StratifiedSampler(CASE_IDS, seed=12).next_batch(60)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+
+class TestAccuracyEstimate(unittest.TestCase):
+    def test_interval_collapses_when_exhausted(self):
+        sizes = {"simple": 400, "multiple": 200}
+        estimate = AccuracyEstimate(sizes)
+        estimate.update("simple", 300, 400)
+        estimate.update("multiple", 50, 200)
+        self.assertAlmostEqual(estimate.mean(), 350 / 600)
+        low, high = estimate.interval()
+        self.assertAlmostEqual(low, estimate.mean())
+        self.assertAlmostEqual(high, estimate.mean())
+
+    def test_interval_narrows_with_samples(self):
+        sizes = {"simple": 400, "multiple": 200}
+        estimate = AccuracyEstimate(sizes)
+        low, high = estimate.interval()
+        width = high - low
+        for evaluated in (20, 100, 300):
+            estimate.update("simple", evaluated // 2, evaluated)
+            estimate.update("multiple", evaluated // 4, evaluated // 2)
+            low, high = estimate.interval()
+            self.assertLess(high - low, width)
+            self.assertLessEqual(low, estimate.mean())
+            self.assertGreaterEqual(high, estimate.mean())
+            width = high - low
+
+    def test_unsampled_category_keeps_interval_open(self):
+        estimate = AccuracyEstimate({"simple": 400, "multiple": 200})
+        estimate.update("simple", 400, 400)
+        low, high = estimate.interval()
+        self.assertGreater(high - low, 0.1)
+
+    def test_matches_bfcl_overall_csv(self):
+        sizes = {category: total for category, (_, total) in BFCL_SCORES.items()}
+        estimate = AccuracyEstimate(sizes, weights=bfcl_overall_weights(sizes))
+        for category, (correct, total) in BFCL_SCORES.items():
+            estimate.update(category, correct, total)
+        row = next(csv.DictReader(io.StringIO(BFCL_OVERALL_CSV)))
+        # the CSV rounds to hundredths of a percent
+        self.assertAlmostEqual(estimate.mean(), float(row["Overall Acc"].rstrip("%")) / 100, delta=0.00005)
+        low, high = estimate.interval()
+        self.assertAlmostEqual(low, high)
+
+    def test_categories_not_run_count_as_zero(self):
+        weights = bfcl_overall_weights({category: total for category, (_, total) in BFCL_SCORES.items()})
+        self.assertAlmostEqual(sum(weights.values()), 1.0)
+        self.assertAlmostEqual(weights["multi_turn_long_context"], 1 / 12)
+        self.assertAlmostEqual(weights["multi_turn_base"], 1 / 12)
+        self.assertAlmostEqual(weights["java"], 1 / 45)
+
+
+class TestStopRule(unittest.TestCase):
+    def test_decision_boundary(self):
+        self.assertIsNone(decision_boundary([], top_k=1))
+        self.assertIsNone(decision_boundary([0.5, None], top_k=2))
+        self.assertEqual(decision_boundary([0.2, 0.9, None, 0.5], top_k=1), 0.9)
+        self.assertEqual(decision_boundary([0.2, 0.9, None, 0.5], top_k=2), 0.5)
+        self.assertIsNone(decision_boundary([0.2, 0.9], top_k=0))
+
+    def test_should_stop(self):
+        self.assertFalse(should_stop((0.1, 0.2), None))
+        self.assertTrue(should_stop((0.1, 0.2), 0.5))
+        self.assertFalse(should_stop((0.4, 0.6), 0.5))
+        self.assertTrue(should_stop((0.6, 0.7), 0.5))
+        self.assertFalse(should_stop((0.6, 0.7), 0.5, full_run_finalists=True))
+        self.assertTrue(should_stop((0.1, 0.2), 0.5, full_run_finalists=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
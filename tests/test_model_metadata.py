@@ -0,0 +1,119 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from huggingface_hub.hf_api import BlobLfsInfo, RepoSibling
+
+from bitagent.validator.model_metadata import ModelMetadataCache
+
+
+class LocalHub:
+    """Stand-in for HfApi.model_info over a dict of repo -> sha, counting calls."""
+
+    def __init__(self, shas, delay=0.0):
+        self.shas = shas
+        self.delay = delay
+        self.card_data = {"license": "mit"}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def model_info(self, repo_id, revision=None, files_metadata=False):
+        with self.lock:
+            self.calls.append((repo_id, revision))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if repo_id not in self.shas:
+                raise Exception(f"{repo_id} not found")
+            return SimpleNamespace(
+                sha=revision or self.shas[repo_id],
+                card_data=self.card_data,
+                safetensors=SimpleNamespace(total=1000),
+                siblings=[
+                    RepoSibling("config.json", size=10, blob_id="abc"),
+                    RepoSibling("model.safetensors", size=1000, blob_id="def", lfs=BlobLfsInfo(1000, "f00d", 130)),
+                ],
+            )
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestModelMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_commit_metadata_is_fetched_once_and_persisted(self):
+        hub = LocalHub({"a/model": "sha1"})
+        cache = ModelMetadataCache(self.tmp.name, api=hub)
+        metadata = cache.metadata("a/model", "sha1")
+        self.assertEqual((metadata["license"], metadata["total_size"]), ("mit", 1000))
+        self.assertEqual(cache.metadata("a/model", "sha1"), metadata)
+
+        reloaded = ModelMetadataCache(self.tmp.name, api=hub)
+        siblings = reloaded.siblings("a/model", "sha1")
+        self.assertEqual(len(hub.calls), 1)
+        self.assertEqual(siblings[1].lfs.sha256, "f00d")
+
+    def test_license_without_card_data(self):
+        hub = LocalHub({"a/model": "sha1", "b/model": "sha1"})
+        cache = ModelMetadataCache(self.tmp.name, api=hub)
+        hub.card_data = None
+        # no card data is an error for the evaluation, not a license skip
+        self.assertIsNone(cache.metadata("a/model", "sha1")["license"])
+        hub.card_data = {"language": "en"}
+        self.assertEqual(cache.metadata("b/model", "sha1")["license"], "Unknown")
+        reloaded = ModelMetadataCache(self.tmp.name, api=hub)
+        self.assertIsNone(reloaded.metadata("a/model", "sha1")["license"])
+
+    def test_latest_sha_expires(self):
+        hub = LocalHub({"a/model": "sha1"})
+        cache = ModelMetadataCache(self.tmp.name, api=hub, sha_ttl=60)
+        self.assertEqual(cache.latest_sha("a/model"), "sha1")
+        hub.shas["a/model"] = "sha2"
+        self.assertEqual(cache.latest_sha("a/model"), "sha1")
+        # the latest sha lookup also cached that commit's metadata
+        cache.metadata("a/model", "sha1")
+        self.assertEqual(len(hub.calls), 1)
+
+        cache.sha_ttl = 0
+        self.assertEqual(cache.latest_sha("a/model"), "sha2")
+
+    def test_latest_shas_bounded_concurrency(self):
+        repos = [f"org/model{i}" for i in range(40)]
+        hub = LocalHub({repo: f"sha{i}" for i, repo in enumerate(repos)}, delay=0.01)
+        cache = ModelMetadataCache(self.tmp.name, api=hub, max_concurrency=4)
+        shas = asyncio.run(cache.latest_shas(repos + repos + ["org/missing"]))
+        self.assertEqual(shas["org/model7"], "sha7")
+        self.assertIsNone(shas["org/missing"])
+        self.assertEqual(len(hub.calls), 41)
+        self.assertLessEqual(hub.max_in_flight, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from bitagent.validator import multi_turn_evaluator
+from bitagent.validator.multi_turn_evaluator import BFCLEvaluator
+
+
+CASES = [{"id": f"multi_turn_base_{i}"} for i in range(4)]
+
+# A stand-in bfcl package: just the modules BFCLEvaluator imports. Every file read, patch and multi-turn
+# instance reused is appended to a log, so the test can see what happened inside the worker processes.
+STUB_BFCL = {
+    "bfcl/__init__.py": "",
+    "bfcl/constants/__init__.py": "",
+    "bfcl/constants/category_mapping.py": 'VERSION_PREFIX = "BFCL_v3"\n',
+    "bfcl/constants/supported_models.py": "SUPPORTED_MODELS = []\n",
+    "bfcl/constants/eval_config.py": """
+        from pathlib import Path
+        PROJECT_ROOT = "{root}"
+        PROMPT_PATH = Path("{root}/data")
+        POSSIBLE_ANSWER_PATH = Path("{root}/data/possible_answer")
+        RESULT_PATH = Path("{root}/result")
+        SCORE_PATH = Path("{root}/score")
+    """,
+    "bfcl/utils.py": """
+        import os, json
+        def log(event):
+            with open("{root}/log.jsonl", "a") as f:
+                f.write(json.dumps([os.getpid(), event]) + "\\n")
+        def load_file(path, sort_by_id=False):
+            log(["read", str(path)])
+            with open(path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        def find_file_with_suffix(root, category):
+            return os.path.join(root, f"BFCL_v3_{{category}}.json")
+        def is_multi_turn(category):
+            return category.startswith("multi_turn")
+    """,
+    "bfcl/_llm_response_generation.py": """
+        import os, json
+        from bfcl.constants.supported_models import SUPPORTED_MODELS
+        from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import execute
+        def main(args):
+            model = args.model[0]
+            if model not in SUPPORTED_MODELS:
+                raise ValueError(f"Unknown model_name '{{model}}'")
+            result_dir = os.path.join(args.result_dir, model)
+            os.makedirs(result_dir, exist_ok=True)
+            with open(os.path.join(result_dir, "BFCL_v3_multi_turn_base_result.json"), "w") as f:
+                for i in range(4):
+                    execute(model, f"multi_turn_base_{{i}}")
+                    f.write(json.dumps({{"id": f"multi_turn_base_{{i}}", "result": os.environ["VLLM_PORT"]}}) + "\\n")
+    """,
+    "bfcl/eval_checker/__init__.py": "",
+    "bfcl/eval_checker/multi_turn_eval/__init__.py": "",
+    "bfcl/eval_checker/multi_turn_eval/multi_turn_utils.py": """
+        from bfcl.utils import log
+        def execute(model_name, test_entry_id):
+            instance_name = f"{{model_name}}_{{test_entry_id}}_instance"
+            if instance_name in globals():
+                log(["reused", instance_name])
+            globals()[instance_name] = object()
+    """,
+    "bfcl/eval_checker/eval_runner.py": """
+        from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import execute
+        def get_handler(model_name):
+            return model_name
+        def multi_turn_runner(handler, model_result, prompt, possible_answer, model_name, test_category, score_dir):
+            for entry in model_result:
+                execute(model_name + "_eval", entry["id"])
+            return sum(entry["result"] == "9001" for entry in model_result) / len(model_result), len(model_result)
+    """,
+    "patch/bfcl_patch.py": """
+        import importlib
+        from bfcl.utils import log
+        def apply_bfcl_patch(verbose=False):
+            log(["patch"])
+            importlib.import_module("bfcl.constants.supported_models").SUPPORTED_MODELS.append("BitAgent")
+    """,
+}
+
+
+class TestBFCLEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for path, source in STUB_BFCL.items():
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            with open(os.path.join(self.root, path), "w") as f:
+                f.write(textwrap.dedent(source).format(root=self.root))
+        for path in ("data/BFCL_v3_multi_turn_base.json", "data/possible_answer/BFCL_v3_multi_turn_base.json"):
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            with open(os.path.join(self.root, path), "w") as f:
+                f.writelines(json.dumps(case) + "\n" for case in CASES)
+
+        multi_turn_evaluator._CORPUS_CACHE.clear()
+        multi_turn_evaluator._CORPUS_INDEX.clear()
+        self.addCleanup(multi_turn_evaluator._CORPUS_CACHE.clear)
+        self.addCleanup(multi_turn_evaluator._CORPUS_INDEX.clear)
+        self.addCleanup(self.unload_stub)
+
+    def unload_stub(self):
+        for name in [name for name in sys.modules if name == "bfcl" or name.startswith("bfcl.")]:
+            del sys.modules[name]
+        if self.root in sys.path:
+            sys.path.remove(self.root)
+
+    def evaluator(self, **kwargs):
+        evaluator = BFCLEvaluator(bfcl_path=self.root, patch_path=os.path.join(self.root, "patch", "bfcl_patch.py"), **kwargs)
+        self.addCleanup(evaluator.close)
+        return evaluator
+
+    def events(self):
+        with open(os.path.join(self.root, "log.jsonl")) as f:
+            return [json.loads(line) for line in f]
+
+    def write_results(self, run_name, model_name, port):
+        result_dir = Path(self.root) / "result" / run_name / model_name
+        os.makedirs(result_dir, exist_ok=True)
+        with open(result_dir / "BFCL_v3_multi_turn_base_result.json", "w") as f:
+            f.writelines(json.dumps({"id": case["id"], "result": port}) + "\n" for case in CASES)
+
+    def test_corpus_is_read_once_across_models(self):
+        evaluator = self.evaluator()
+        for run_name, model_name, port in (("a", "BitAgent", "9001"), ("b", "Other", "9002")):
+            self.write_results(run_name, model_name, port)
+            scores = evaluator._score_results(
+                model_name, ["multi_turn_base"], Path(self.root) / "result" / run_name, Path(self.root) / "score" / run_name,
+            )
+            self.assertEqual(scores["overall_score"], 1.0 if port == "9001" else 0.0)
+
+        reads = [event[1] for _, event in self.events() if event[0] == "read"]
+        corpus_reads = [path for path in reads if "/data/" in path]
+        self.assertEqual(sorted(corpus_reads), sorted([
+            os.path.join(self.root, "data", "BFCL_v3_multi_turn_base.json"),
+            os.path.join(self.root, "data", "possible_answer", "BFCL_v3_multi_turn_base.json"),
+        ]))
+        # only the model results are read per evaluation
+        self.assertEqual(len(reads) - len(corpus_reads), 2)
+
+    def test_worker_keeps_its_cache_and_isolates_evaluations(self):
+        evaluator = self.evaluator(max_concurrent_evaluations=1)
+        results = evaluator.evaluate_models([{"port": 9001}, {"port": 9002}, {"port": 9001}])
+        self.assertEqual([r.get("overall_score") for r in results], [1.0, 0.0, 1.0], results)
+
+        events = self.events()
+        workers = {pid for pid, _ in events}
+        self.assertEqual(len(workers), 1)
+        self.assertNotIn(os.getpid(), workers)
+        self.assertEqual([event for _, event in events if event[0] == "patch"], [["patch"]])
+        corpus_reads = [event for _, event in events if event[0] == "read" and "/data/" in event[1]]
+        self.assertEqual(len(corpus_reads), 2)
+        # every evaluation is "BitAgent", none of them saw another's multi-turn instances
+        self.assertEqual([event for _, event in events if event[0] == "reused"], [])
+
+    def test_concurrent_evaluations_use_separate_workers(self):
+        evaluator = self.evaluator(max_concurrent_evaluations=2)
+        results = evaluator.evaluate_models([{"port": 9001}, {"port": 9002}, {"port": 9001}, {"port": 9002}])
+        self.assertEqual([r.get("overall_score") for r in results], [1.0, 0.0, 1.0, 0.0], results)
+        events = self.events()
+        self.assertLessEqual(len({pid for pid, _ in events}), 2)
+        self.assertEqual([event for _, event in events if event[0] == "reused"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
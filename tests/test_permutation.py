@@ -0,0 +1,54 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import unittest
+
+from bitagent.helpers.permutation import KeyedPermutation, EpochPermutationIterator
+
+
+class TestKeyedPermutation(unittest.TestCase):
+    def test_is_a_bijection(self):
+        for n in [1, 2, 3, 7, 64, 1000, 4097]:
+            permutation = KeyedPermutation(n, key=1234)
+            self.assertEqual(sorted(permutation[i] for i in range(n)), list(range(n)))
+
+    def test_key_changes_order(self):
+        first = [KeyedPermutation(1000, key=1)[i] for i in range(1000)]
+        second = [KeyedPermutation(1000, key=2)[i] for i in range(1000)]
+        self.assertNotEqual(first, second)
+
+
+class TestEpochPermutationIterator(unittest.TestCase):
+    def test_each_epoch_is_a_fresh_full_pass(self):
+        iterator = EpochPermutationIterator(50, seed=572343)
+        epoch_0 = [next(iterator) for _ in range(50)]
+        epoch_1 = [next(iterator) for _ in range(50)]
+        self.assertEqual(sorted(epoch_0), list(range(50)))
+        self.assertEqual(sorted(epoch_1), list(range(50)))
+        self.assertNotEqual(epoch_0, epoch_1)
+
+    def test_resumes_from_state(self):
+        iterator = EpochPermutationIterator(50, seed=7)
+        for _ in range(73):
+            next(iterator)
+        resumed = EpochPermutationIterator(50, seed=7, **iterator.state())
+        self.assertEqual([next(resumed) for _ in range(40)], [next(iterator) for _ in range(40)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import unittest
+import bittensor as bt
+from types import SimpleNamespace
+
+from bitagent.protocol import QueryTask, QueryTaskBatch, StreamingQueryTask
+from bitagent.schemas.chat import ChatMessage
+from bitagent.schemas.tool import Tool
+
+
+def make_tool(name, **arguments):
+    return Tool(name=name, description=f"{name} tool", arguments=arguments or {"x": {"type": "int", "required": True}})
+
+
+def make_task(content, tools):
+    return QueryTask(messages=[ChatMessage(role="user", content=content)], tools=tools)
+
+
+class TestQueryTaskBatch(unittest.TestCase):
+    def setUp(self):
+        self.weather = make_tool("weather")
+        self.search = make_tool("search")
+        self.clock = make_tool("clock")
+        self.query_tasks = [
+            make_task("first", [self.weather, self.search]),
+            make_task("second", [self.search]),
+            make_task("third", [self.clock, self.weather]),
+        ]
+
+    def test_round_trip_preserves_order_and_tools(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        round_trip = batch.to_query_tasks()
+        self.assertEqual([t.messages[0].content for t in round_trip], ["first", "second", "third"])
+        for original, restored in zip(self.query_tasks, round_trip):
+            self.assertEqual([tool.name for tool in restored.tools], [tool.name for tool in original.tools])
+
+    def test_shared_tools_are_sent_once(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        self.assertEqual([tool.name for tool in batch.tools], ["weather", "search", "clock"])
+        self.assertEqual([task.tool_ids for task in batch.tasks], [[0, 1], [1], [2, 0]])
+
+    def test_responses_map_back_to_their_task(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        batch.responses = ["weather(x=1)", "search(x=2)", "clock(x=3)"]
+        round_trip = batch.to_query_tasks()
+        self.assertEqual([t.response for t in round_trip], batch.responses)
+        self.assertEqual([t.messages[0].content for t in round_trip], ["first", "second", "third"])
+
+    def test_process_time_is_split_across_tasks(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        batch.responses = ["a()", "b()", "c()"]
+        batch.dendrite = bt.TerminalInfo(process_time=3.0, status_code=200)
+        round_trip = batch.to_query_tasks()
+        self.assertEqual([t.dendrite.process_time for t in round_trip], [1.0, 1.0, 1.0])
+        self.assertEqual(round_trip[0].dendrite.status_code, 200)
+        # the batch's own terminal info is left as it was
+        self.assertEqual(batch.dendrite.process_time, 3.0)
+
+    def test_mismatched_responses_are_rejected(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        for responses in (["a()", "b()"], ["a()", "b()", "c()", "d()"]):
+            batch.responses = responses
+            self.assertEqual([t.response for t in batch.to_query_tasks()], ["", "", ""])
+
+    def test_out_of_range_tool_ids_score_as_failure(self):
+        batch = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        batch.responses = ["a()", "b()", "c()"]
+        batch.tasks[1].tool_ids = [7]
+        round_trip = batch.to_query_tasks()
+        self.assertEqual(round_trip[1].tools, [])
+        self.assertEqual(round_trip[1].response, "")
+        self.assertEqual([round_trip[0].response, round_trip[2].response], ["a()", "c()"])
+
+    def test_same_tasks(self):
+        sent = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        returned = QueryTaskBatch.from_query_tasks(self.query_tasks)
+        returned.responses = ["a()", "b()", "c()"]
+        self.assertTrue(sent.same_tasks(returned))
+        returned.tasks[0].messages = [ChatMessage(role="user", content="changed")]
+        self.assertFalse(sent.same_tasks(returned))
+        self.assertFalse(sent.same_tasks(QueryTaskBatch.from_query_tasks(self.query_tasks[:2])))
+
+
+class FakeStream:
+    """Stands in for the aiohttp response the dendrite streams from, counting the chunks read."""
+
+    def __init__(self, chunks):
+        self.chunks = [c.encode("utf-8") if isinstance(c, str) else c for c in chunks]
+        self.read = 0
+        self.content = SimpleNamespace(iter_any=self.iter_any)
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+def read_stream(synapse, stream):
+    async def consume():
+        return [text async for text in synapse.process_streaming_response(stream)]
+    return asyncio.run(consume())
+
+
+class TestStreamingQueryTask(unittest.TestCase):
+    def test_call_split_across_chunks(self):
+        synapse = StreamingQueryTask()
+        stream = FakeStream(["get_wea", "ther(city=", "'Par", "is')"])
+        texts = read_stream(synapse, stream)
+        self.assertTrue(synapse.call_complete)
+        self.assertEqual(synapse.response, "get_weather(city='Paris')")
+        self.assertEqual("".join(texts), synapse.response)
+
+    def test_text_after_the_call_is_ignored(self):
+        synapse = StreamingQueryTask()
+        stream = FakeStream(["[search(q='a)')]", " and some", " explanation", " nobody reads"])
+        read_stream(synapse, stream)
+        self.assertTrue(synapse.call_complete)
+        self.assertEqual(synapse.response, "[search(q='a)')]")
+        # the stream is abandoned as soon as the call closes
+        self.assertEqual(stream.read, 1)
+
+    def test_multibyte_character_split_across_chunks(self):
+        synapse = StreamingQueryTask()
+        encoded = "translate(text='café')".encode("utf-8")
+        split = encoded.index(b"\xa9")
+        read_stream(synapse, FakeStream([encoded[:split], encoded[split:]]))
+        self.assertTrue(synapse.call_complete)
+        self.assertEqual(synapse.response, "translate(text='café')")
+
+    def test_stream_ending_without_a_complete_call(self):
+        for chunks in (["get_weather(city=", "'Paris'"], ["I can't ", "help with that."], []):
+            synapse = StreamingQueryTask()
+            read_stream(synapse, FakeStream(chunks))
+            self.assertFalse(synapse.call_complete)
+            self.assertEqual(synapse.response, "".join(chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+import random
+import unittest
+
+from bitagent.helpers.string_parse import parse_multiple_space_sep_json
+
+
+def reference_parse_multiple_space_sep_json(json_str):
+    """The original implementation, outputs of the current one must match it."""
+    results = []
+    start = 0
+    json_str = json_str.strip()
+    while start < len(json_str):
+        start = json_str.find('{', start)
+        if start == -1:
+            break
+        try:
+            obj, index = json.JSONDecoder().raw_decode(json_str[start:])
+            results.append(obj)
+            start += index
+            while start < len(json_str) and json_str[start] in ' \t\n\r':
+                start += 1
+        except json.JSONDecodeError:
+            start += 1
+    return results
+
+
+def make_log(rng, n, malformed, sep):
+    calls = []
+    for i in range(n):
+        call = json.dumps({"name": f"tool_{rng.randrange(5)}", "arguments": {"limit": rng.randrange(100), "filters": {"id": i}}})
+        if rng.random() < malformed:
+            call = call[:rng.randrange(1, len(call) - 1)]
+        calls.append(call)
+    return sep.join(calls)
+
+
+class TestParseMultipleSpaceSepJson(unittest.TestCase):
+    def test_simple(self):
+        self.assertEqual(parse_multiple_space_sep_json('{"a": 1} {"b": 2}'), [{"a": 1}, {"b": 2}])
+        self.assertEqual(parse_multiple_space_sep_json("no json here"), [])
+
+    def test_objects_nested_in_a_malformed_one_are_kept(self):
+        self.assertEqual(parse_multiple_space_sep_json('{"a": {"b": 1}, oops} {"c": 2}'), [{"b": 1}, {"c": 2}])
+
+    def test_matches_reference_on_truncated_logs(self):
+        rng = random.Random(0)
+        for i in range(200):
+            log = make_log(rng, rng.randrange(1, 30), malformed=0.3, sep=" " if i % 2 else "\n")
+            self.assertEqual(parse_multiple_space_sep_json(log), reference_parse_multiple_space_sep_json(log))
+
+    def test_matches_reference_past_the_rebase_point(self):
+        rng = random.Random(1)
+        log = make_log(rng, 3000, malformed=0.2, sep=" ")
+        self.assertGreater(len(log), 1 << 16)
+        self.assertEqual(parse_multiple_space_sep_json(log), reference_parse_multiple_space_sep_json(log))
+
+
+if __name__ == "__main__":
+    unittest.main()
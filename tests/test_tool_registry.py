@@ -0,0 +1,145 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import bitagent
+from bitagent.helpers.tool_registry import ToolRegistry
+from bitagent.schemas.tool import Tool
+from neurons.miner import Miner
+
+
+def make_tool(name, arguments=None):
+    return Tool(name=name, description=f"{name} tool", arguments=arguments or {"x": {"type": "int", "required": True}})
+
+
+class FakeToolDendrite:
+    """Answers GetTools from a validator side registry, counting the requests."""
+
+    def __init__(self, validator_registry, fail=False):
+        self.validator_registry = validator_registry
+        self.fail = fail
+        self.requests = []
+
+    async def forward(self, axons, synapse, timeout, deserialize):
+        self.requests.append(list(synapse.tool_hashes))
+        if self.fail:
+            raise ConnectionError("validator unreachable")
+        synapse.tools = [self.validator_registry.get(h) for h in synapse.tool_hashes if self.validator_registry.get(h)]
+        return synapse
+
+
+def fake_miner(tool_dendrite):
+    return SimpleNamespace(
+        tool_registry=ToolRegistry(),
+        tool_dendrite=tool_dendrite,
+        metagraph=SimpleNamespace(hotkeys=["validator-hotkey"], axons=["validator-axon"]),
+    )
+
+
+def hashed_task(tool_hashes, tools=None):
+    synapse = bitagent.protocol.QueryTask(tools=tools or [], tool_hashes=tool_hashes)
+    synapse.dendrite.hotkey = "validator-hotkey"
+    return synapse
+
+
+class TestToolContentHash(unittest.TestCase):
+    def test_key_order_does_not_change_the_hash(self):
+        first = make_tool("search", {"query": {"type": "str", "required": True}, "limit": {"required": False, "type": "int"}})
+        second = make_tool("search", {"limit": {"type": "int", "required": False}, "query": {"required": True, "type": "str"}})
+        self.assertEqual(first.content_hash(), second.content_hash())
+
+    def test_content_changes_the_hash(self):
+        self.assertNotEqual(make_tool("search").content_hash(), make_tool("lookup").content_hash())
+        self.assertNotEqual(
+            make_tool("search", {"q": {"type": "str"}}).content_hash(),
+            make_tool("search", {"q": {"type": "int"}}).content_hash(),
+        )
+
+
+class TestToolRegistry(unittest.TestCase):
+    def test_hit_and_miss(self):
+        registry = ToolRegistry()
+        search, clock = make_tool("search"), make_tool("clock")
+        hashes = registry.add([search, clock])
+        self.assertEqual(registry.resolve(hashes[::-1]), [clock, search])
+        self.assertEqual(registry.missing(hashes + ["unknown", "unknown"]), ["unknown"])
+        with self.assertRaises(KeyError):
+            registry.resolve([hashes[0], "unknown"])
+
+    def test_resolve_or_falls_back(self):
+        registry = ToolRegistry()
+        hashes = registry.add([make_tool("search")])
+        inline = [make_tool("inline")]
+        self.assertEqual(registry.resolve_or(hashes, inline), registry.resolve(hashes))
+        self.assertEqual(registry.resolve_or(hashes + ["unknown"], inline), inline)
+
+    def test_least_recently_used_is_evicted(self):
+        registry = ToolRegistry(maxsize=2)
+        first = registry.add([make_tool("a")])[0]
+        second = registry.add([make_tool("b")])[0]
+        registry.get(first)
+        third = registry.add([make_tool("c")])[0]
+        self.assertEqual(registry.missing([first, second, third]), [second])
+
+
+class TestResolveToolHashes(unittest.TestCase):
+    def setUp(self):
+        self.validator_registry = ToolRegistry()
+        self.tools = [make_tool("search"), make_tool("clock")]
+        self.hashes = self.validator_registry.add(self.tools)
+
+    def resolve(self, miner, synapse):
+        return asyncio.run(Miner.resolve_tool_hashes(miner, synapse))
+
+    def test_registry_hit_skips_the_validator(self):
+        dendrite = FakeToolDendrite(self.validator_registry)
+        miner = fake_miner(dendrite)
+        miner.tool_registry.add(self.tools)
+        synapse = self.resolve(miner, hashed_task(self.hashes))
+        self.assertEqual([t.name for t in synapse.tools], ["search", "clock"])
+        self.assertEqual(dendrite.requests, [])
+
+    def test_registry_miss_fetches_once(self):
+        dendrite = FakeToolDendrite(self.validator_registry)
+        miner = fake_miner(dendrite)
+        synapse = self.resolve(miner, hashed_task(self.hashes))
+        self.assertEqual([t.name for t in synapse.tools], ["search", "clock"])
+        self.resolve(miner, hashed_task(self.hashes[::-1]))
+        self.assertEqual(dendrite.requests, [self.hashes])
+
+    def test_unknown_hash_falls_back_to_inline_tools(self):
+        dendrite = FakeToolDendrite(self.validator_registry)
+        miner = fake_miner(dendrite)
+        inline = [make_tool("inline")]
+        synapse = self.resolve(miner, hashed_task(["unknown"], tools=inline))
+        self.assertEqual([t.name for t in synapse.tools], ["inline"])
+        self.assertEqual(dendrite.requests, [])
+
+    def test_unresolvable_hash_answers_without_tools(self):
+        for dendrite in (FakeToolDendrite(self.validator_registry), FakeToolDendrite(self.validator_registry, fail=True)):
+            miner = fake_miner(dendrite)
+            synapse = self.resolve(miner, hashed_task(["unknown"]))
+            self.assertEqual(synapse.tools, [])
+            self.assertEqual(dendrite.requests, [["unknown"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 RogueTensor
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import unittest
+import numpy as np
+
+from common.utils.weight_utils import (
+    U16_MAX,
+    normalize_max_weight,
+    convert_weights_and_uids_for_emit,
+)
+
+
+def reference_normalize_max_weight(x, limit=0.1):
+    """The original loop-based normalize_max_weight, kept to check the vectorized version."""
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 0:
+        x = x[None]
+    epsilon = 1e-7
+
+    weights = x.copy()
+    values = np.sort(weights)
+
+    if x.sum() == 0 or len(x) * limit <= 1:
+        return np.ones_like(x) / x.size
+    estimation = values / values.sum()
+    if estimation.max() <= limit:
+        return weights / weights.sum()
+
+    cumsum = np.cumsum(estimation, 0)
+    estimation_sum = np.array(
+        [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
+    )
+    n_values = (estimation / (estimation_sum + cumsum + epsilon) < limit).sum()
+    cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+            1 - (limit * (len(estimation) - n_values))
+    )
+    cutoff = cutoff_scale * values.sum()
+    weights[weights > cutoff] = cutoff
+    return weights / weights.sum()
+
+
+def reference_convert_weights_and_uids_for_emit(uids, weights):
+    """The original loop-based convert_weights_and_uids_for_emit, kept to check the vectorized version."""
+    uids = np.asarray(uids)
+    weights = np.asarray(weights)
+    if np.sum(weights) == 0:
+        return [], []
+    max_weight = float(np.max(weights))
+    weights = [float(value) / max_weight for value in weights]
+
+    weight_vals = []
+    weight_uids = []
+    for weight_i, uid_i in zip(weights, uids):
+        uint16_val = round(float(weight_i) * int(U16_MAX))
+        if uint16_val != 0:
+            weight_vals.append(uint16_val)
+            weight_uids.append(uid_i)
+    return weight_uids, weight_vals
+
+
+class WeightUtilsTestCase(unittest.TestCase):
+    """
+    Checks that the vectorized weight pipeline matches the original per-element implementation.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(20)
+
+    def random_weights(self, n):
+        weights = self.rng.random(n).astype(np.float32)
+        # sparse, skewed vectors like real score arrays
+        weights[self.rng.random(n) < 0.5] = 0.0
+        weights[self.rng.integers(0, n, size=3)] *= 100
+        return weights
+
+    def test_normalize_max_weight_matches_reference(self):
+        for n in (1, 2, 16, 256, 1024, 4096):
+            for limit in (0.01, 0.1, 0.5, 1.0):
+                x = self.random_weights(n)
+                np.testing.assert_array_equal(
+                    normalize_max_weight(x, limit=limit),
+                    reference_normalize_max_weight(x, limit=limit),
+                )
+
+    def test_normalize_max_weight_all_zero(self):
+        x = np.zeros(256, dtype=np.float32)
+        np.testing.assert_array_equal(
+            normalize_max_weight(x, limit=0.1),
+            reference_normalize_max_weight(x, limit=0.1),
+        )
+
+    def test_convert_weights_and_uids_for_emit_matches_reference(self):
+        for n in (1, 16, 256, 4096):
+            uids = np.arange(n)
+            weights = normalize_max_weight(self.random_weights(n), limit=0.1)
+            weight_uids, weight_vals = convert_weights_and_uids_for_emit(uids, weights)
+            ref_uids, ref_vals = reference_convert_weights_and_uids_for_emit(uids, weights)
+            self.assertEqual(weight_uids, [int(u) for u in ref_uids])
+            self.assertEqual(weight_vals, ref_vals)
+
+    def test_convert_weights_and_uids_for_emit_nothing_to_set(self):
+        self.assertEqual(convert_weights_and_uids_for_emit(np.arange(4), np.zeros(4)), ([], []))
+
+    def test_convert_weights_and_uids_for_emit_rejects_negative(self):
+        with self.assertRaises(ValueError):
+            convert_weights_and_uids_for_emit(np.arange(3), np.array([0.5, -0.1, 0.6]))
+
+
+if __name__ == "__main__":
+    unittest.main()